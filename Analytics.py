@@ -0,0 +1,280 @@
+"""
+Advanced metrics computed from StatsTracker game data, for players and both teams.
+
+    eFG%    (FGM + 0.5 * 3PM) / FGA
+    TS%     PTS / (2 * (FGA + 0.44 * FTA))
+    POSS    FGA + 0.44 * FTA - ORB + TOV, averaged over the two teams
+    ORTG    points scored per 100 possessions; DRTG: points allowed per 100 possessions
+    AST_TO  assists per turnover
+    ORB%    share of the available offensive rebounds (own misses); DRB% and TRB% likewise
+
+Minutes are not tracked, so for players ORTG is points per 100 possessions
+the player used (FGA + 0.44 * FTA + TOV), the rebound percentages are shares
+of the whole game's available rebounds, and DRTG is a team metric only.
+
+batch_metrics() scores any number of games in one vectorized pass over a
+stat matrix (NumPy, or plain Python when NumPy is not installed).
+SessionMetrics keeps a live game's metrics until the game changes, and
+score_archive() keeps a season of saved games' metrics in a cache file,
+so only new or changed games are loaded and scored again.
+
+Run with:  python Analytics.py PATH [PATH ...] [--out season_metrics.json] [--cache analytics_cache.json]
+where PATH is anything Replay.py accepts (logs, stats files or game folders).
+"""
+import argparse
+import json
+import os
+import time
+
+import Persistence
+import Replay
+import StatsTracker
+
+DEFAULT_OUT = "season_metrics.json"
+ANALYTICS_CACHE_FILE = "analytics_cache.json"
+
+STAT_KEYS = StatsTracker.STAT_KEYS_T1
+FT_WEIGHT = 0.44  # Share of free throw attempts that end a possession
+
+# NumPy is imported on first use (see _numpy_available), so importing this module stays cheap
+np = None
+_import_tried = False
+
+
+def _numpy_available():
+    """Returns True if NumPy is installed and columns can be evaluated as arrays."""
+    global np, _import_tried
+    if not _import_tried:
+        _import_tried = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:  # NumPy is optional; the same formulas then run row by row
+            pass
+    return np is not None
+
+
+def _ratio(numerator, denominator, scale=100.0, digits=1):
+    """numerator / denominator * scale, rounded; 0.0 where the denominator is zero."""
+    if np is not None and isinstance(denominator, np.ndarray):
+        out = np.zeros(denominator.shape)
+        np.divide(numerator * scale, denominator, out=out, where=denominator != 0)
+        return np.round(out, digits)
+    return round(numerator * scale / denominator, digits) if denominator else 0.0
+
+def _rounded(value, digits=1):
+    return np.round(value, digits) if np is not None and isinstance(value, np.ndarray) else round(value, digits)
+
+
+# --- FORMULAS ---
+# Each formula takes {stat: value} mappings whose values are either whole columns
+# (NumPy arrays, one entry per row) or single numbers, and returns {metric: value}.
+
+def _shot_attempts(s):
+    field_goals = s['2P_Made'] + s['3P_Made']
+    attempts = s['2P_Attempted'] + s['3P_Attempted']
+    return field_goals, attempts, attempts + FT_WEIGHT * s['FT_Attempted']
+
+def _shooting_metrics(s):
+    field_goals, attempts, true_attempts = _shot_attempts(s)
+    return {
+        'eFG_PCT': _ratio(field_goals + 0.5 * s['3P_Made'], attempts),
+        'TS_PCT': _ratio(s['Points'], 2 * true_attempts),
+        'AST_TO': _ratio(s['Assists'], s['Turnovers'], scale=1.0, digits=2),
+    }
+
+def _team_metrics(team, opponent):
+    _, _, true_attempts = _shot_attempts(team)
+    _, _, opponent_true_attempts = _shot_attempts(opponent)
+    possessions = ((true_attempts - team['Off_Rebounds'] + team['Turnovers']) +
+                   (opponent_true_attempts - opponent['Off_Rebounds'] + opponent['Turnovers'])) / 2
+    rebounds = team['Off_Rebounds'] + team['Def_Rebounds']
+    opponent_rebounds = opponent['Off_Rebounds'] + opponent['Def_Rebounds']
+    return {
+        **_shooting_metrics(team),
+        'POSS': _rounded(possessions),
+        'ORTG': _ratio(team['Points'], possessions),
+        'DRTG': _ratio(opponent['Points'], possessions),
+        'ORB_PCT': _ratio(team['Off_Rebounds'], team['Off_Rebounds'] + opponent['Def_Rebounds']),
+        'DRB_PCT': _ratio(team['Def_Rebounds'], team['Def_Rebounds'] + opponent['Off_Rebounds']),
+        'TRB_PCT': _ratio(rebounds, rebounds + opponent_rebounds),
+    }
+
+def _player_metrics(player, team, opponent):
+    _, _, true_attempts = _shot_attempts(player)
+    used = true_attempts + player['Turnovers']
+    return {
+        **_shooting_metrics(player),
+        'POSS_USED': _rounded(used),
+        'ORTG': _ratio(player['Points'], used),
+        'ORB_PCT': _ratio(player['Off_Rebounds'], team['Off_Rebounds'] + opponent['Def_Rebounds']),
+        'DRB_PCT': _ratio(player['Def_Rebounds'], team['Def_Rebounds'] + opponent['Off_Rebounds']),
+        'TRB_PCT': _ratio(player['Off_Rebounds'] + player['Def_Rebounds'],
+                          team['Off_Rebounds'] + team['Def_Rebounds'] + opponent['Off_Rebounds'] + opponent['Def_Rebounds']),
+    }
+
+
+def _evaluate(formula, *tables):
+    """
+    Applies formula to every row of the given tables (equally long lists of stat
+    rows in STAT_KEYS order): once on whole columns with NumPy, else row by row.
+    Returns one {metric: value} dictionary per row.
+    """
+    if not tables[0]:
+        return []
+    if _numpy_available():
+        arrays = [np.asarray(table, dtype=np.float64) for table in tables]
+        columns = formula(*({key: array[:, j] for j, key in enumerate(STAT_KEYS)} for array in arrays))
+        names = list(columns)
+        return [dict(zip(names, values)) for values in zip(*(columns[name].tolist() for name in names))]
+    return [formula(*(dict(zip(STAT_KEYS, row)) for row in rows)) for rows in zip(*tables)]
+
+
+# --- GAMES ---
+
+def _stat_row(stats):
+    return [stats.get(key, 0) for key in STAT_KEYS]
+
+def _team_rows(data):
+    """(Team 1 row, Team 2 row) of game totals, as StatsTracker.get_team_stats adds them up."""
+    team1 = [0] * len(STAT_KEYS)
+    for player in data['roster']['Team1']:
+        for j, value in enumerate(_stat_row(data['player_stats'].get(player['name'], {}))):
+            team1[j] += value
+    team1[STAT_KEYS.index('Off_Rebounds')] += data['team1_team_rebounds'].get('Off_Rebounds', 0)
+    team1[STAT_KEYS.index('Def_Rebounds')] += data['team1_team_rebounds'].get('Def_Rebounds', 0)
+    return team1, _stat_row(data['team2_generic_stats'])
+
+def batch_metrics(games):
+    """
+    Scores a list of game_data dictionaries in one pass. Returns, per game,
+    {'teams': {'Team1': {...}, 'Team2': {...}}, 'players': {name: {...}}}
+    for the Team 1 roster.
+    """
+    team_table, opponent_table = [], []
+    player_table, player_team, player_opponent, player_names = [], [], [], []
+    for data in games:
+        team1, team2 = _team_rows(data)
+        team_table += [team1, team2]
+        opponent_table += [team2, team1]
+        for player in data['roster']['Team1']:
+            player_table.append(_stat_row(data['player_stats'].get(player['name'], {})))
+            player_team.append(team1)
+            player_opponent.append(team2)
+            player_names.append(player['name'])
+
+    team_results = _evaluate(_team_metrics, team_table, opponent_table)
+    player_results = iter(zip(player_names, _evaluate(_player_metrics, player_table, player_team, player_opponent)))
+
+    results = []
+    for i, data in enumerate(games):
+        players = dict(next(player_results) for _ in data['roster']['Team1'])
+        results.append({'teams': {'Team1': team_results[2 * i], 'Team2': team_results[2 * i + 1]}, 'players': players})
+    return results
+
+def game_metrics(data):
+    """Metrics for a single game_data dictionary (see batch_metrics)."""
+    return batch_metrics([data])[0]
+
+
+class SessionMetrics:
+    """Metrics for a live GameSession, computed on first use and again only after the game changes."""
+
+    def __init__(self, session):
+        self.session = session
+        self._metrics = None
+        session.add_listener(self._on_change)
+
+    def _on_change(self, session, event, sign):
+        self._metrics = None
+
+    def close(self):
+        self.session.remove_listener(self._on_change)
+
+    def get(self):
+        metrics = self._metrics
+        if metrics is None:
+            data = self.session.data
+            with self.session.lock:
+                metrics = self._metrics = game_metrics(data)
+        return metrics
+
+
+# --- SEASON ARCHIVE ---
+
+def _signature(path):
+    """Changes whenever the file is rewritten or appended to."""
+    info = os.stat(path)
+    return [info.st_mtime_ns, info.st_size]
+
+def _read_cache(cache_path):
+    if cache_path is None or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading analytics cache: {e}. Scoring every game again.")
+        return {}
+
+def score_archive(paths, cache_path=ANALYTICS_CACHE_FILE):
+    """
+    Returns {game id: metrics} for every game found under paths (as in Replay.py).
+    Games whose file is unchanged since the last run come from the cache file;
+    the rest are loaded and scored together in one batch. cache_path=None
+    disables the cache.
+    """
+    games = Replay.find_games(paths)
+    cache = _read_cache(cache_path)
+
+    results = {}
+    stale_ids, stale_data, stale_entries = [], [], []
+    for game_id, path in games:
+        key = os.path.abspath(path)
+        try:
+            signature = _signature(path)
+            entry = cache.get(key)
+            if entry is not None and entry['signature'] == signature:
+                results[game_id] = entry['metrics']
+                continue
+            data, _ = Replay.load_game(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error scoring {game_id}: {type(e).__name__}: {e}")
+            continue
+        stale_ids.append(game_id)
+        stale_data.append(data)
+        stale_entries.append((key, signature))
+
+    for game_id, (key, signature), metrics in zip(stale_ids, stale_entries, batch_metrics(stale_data)):
+        results[game_id] = metrics
+        cache[key] = {'signature': signature, 'metrics': metrics}
+
+    if cache_path is not None and stale_ids:
+        try:
+            Persistence.atomic_write(cache_path, json.dumps(cache))
+        except OSError as e:
+            print(f"Error saving analytics cache: {e}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute advanced metrics for saved games.")
+    parser.add_argument('paths', nargs='+', help="event logs, stats files, game directories or folders of games")
+    parser.add_argument('--out', default=DEFAULT_OUT, help="JSON file the metrics are written to")
+    parser.add_argument('--cache', default=ANALYTICS_CACHE_FILE, help="cache of earlier results ('' to disable)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = score_archive(args.paths, args.cache or None)
+    elapsed = time.perf_counter() - start
+    if not results:
+        print("No games scored.")
+        raise SystemExit(1)
+
+    Persistence.atomic_write(args.out, json.dumps(results, indent=4))
+    print(f"{len(results)} game(s) scored in {elapsed:.2f}s "
+          f"({'NumPy' if _numpy_available() else 'pure Python'}). Metrics in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
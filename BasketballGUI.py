@@ -1,10 +1,24 @@
+import time
+_MODULE_START = time.perf_counter()  # Startup report: time spent importing this module and its dependencies
 import os
 import sys
+import math
+from collections import deque
 import tkinter as tk
-from tkinter import font as tkfont, messagebox, ttk
+from tkinter import font as tkfont, messagebox, ttk, filedialog
 import StatsTracker
+import GameClock
+import Diagnostics
 import copy 
 
+INPUT_TICK_MS = 16        # Stat clicks within one tick are committed (saved, redrawn) together
+INPUT_LATENCY_SAMPLES = 500
+IMAGE_RESERVED_HEIGHT = 260  # Intermission page height used by everything but the image
+IMAGE_MIN_HEIGHT = 120
+DIAGNOSTICS_REFRESH_MS = 1000  # Diagnostics panel redraw period while it is open
+WARM_PAGES = True         # Build the pages not shown yet one at a time while the app is idle
+STARTUP_REPORT = True     # Print the startup timing report once the first page is painted
+
 def resource_path(relative_path):
     """
     Get absolute path to resource, works for development and for PyInstaller
@@ -21,11 +35,18 @@ def resource_path(relative_path):
 
 class BasketballApp(tk.Tk):
     def __init__(self, *args, **kwargs):
+        init_start = time.perf_counter()
+        # Milliseconds for each startup phase (see startup_report)
+        self.startup_times = {'import': (init_start - _MODULE_START) * 1000}
         tk.Tk.__init__(self, *args, **kwargs)
 
         try:
             # Ensure load_data is called before accessing game_data
+            load_start = time.perf_counter()
             StatsTracker.load_data() 
+            if StatsTracker.USE_SEASON_STORE:
+                StatsTracker.attach_season_store()
+            self.startup_times['data load'] = (time.perf_counter() - load_start) * 1000
         except AttributeError:
             messagebox.showerror("Initialization Error", "Could not initialize StatsTracker. Check if StatsTracker.py is in the directory.")
             self.destroy()
@@ -42,31 +63,146 @@ class BasketballApp(tk.Tk):
         container.pack(side="top", fill="both", expand=True)
         container.grid_rowconfigure(0, weight=1)
         container.grid_columnconfigure(0, weight=1)
+        self.container = container
+
+        # Game clock and shot clock; every recorded event is stamped with the game clock
+        self.game_clock = GameClock.GameClock()
+        StatsTracker.attach_clock(self.game_clock)
 
+        # Pages are built on first show_frame (or while idle, see WARM_PAGES)
+        self.page_classes = {F.__name__: F for F in (HomePage, ScoreboardPage, PlayerStatsPage, IntermissionPage, RosterManagementPage)}
         self.frames = {}
-        
-        for F in (HomePage, ScoreboardPage, PlayerStatsPage, IntermissionPage, RosterManagementPage):
-            page_name = F.__name__
-            frame = F(parent=container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
 
+        # Change keys (see StatsTracker.affected_keys) each built page has not redrawn yet.
+        # Hidden pages catch up when shown; the visible one redraws once per click.
+        self.current_page = None
+        self.pending_keys = {}
+        self._refresh_scheduled = False
+        StatsTracker.add_listener(self._on_data_changed)
+
+        # Stat clicks: applied at once, committed once per input tick
+        self._input_tick = None
+        self._input_times = []
+        self.input_latencies_ms = deque(maxlen=INPUT_LATENCY_SAMPLES)
+
+        # Hidden diagnostics panel (Ctrl+Shift+D): timing of tracker operations and page refreshes
+        self.diagnostics_window = None
+        self.bind_all("<Control-Shift-D>", self.toggle_diagnostics)
+
+        page_start = time.perf_counter()
         self.show_frame("HomePage") 
+        self.startup_times['first page'] = (time.perf_counter() - page_start) * 1000
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Idle callbacks run once mainloop has drawn the window
+        self._init_start = init_start
+        self.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self):
+        self.startup_times['first paint'] = (time.perf_counter() - self._init_start) * 1000
+        if STARTUP_REPORT:
+            print(self.startup_report())
+        if WARM_PAGES:
+            self.after_idle(self._warm_next_page)
+
+    def startup_report(self):
+        """One line of startup phase timings, e.g. 'Startup: import 120 ms, data load 4 ms, ...'."""
+        return "Startup: " + ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in self.startup_times.items())
+
+    def get_page(self, page_name):
+        """Returns a page, building it on first use."""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            frame = self.page_classes[page_name](parent=self.container, controller=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[page_name] = frame
+            if hasattr(frame, 'refresh'):
+                self.pending_keys[page_name] = {'all'}
+        return frame
+
+    def _warm_next_page(self):
+        """Builds one page that has not been shown yet, then yields to pending events before the next."""
+        for page_name in self.page_classes:
+            if page_name not in self.frames:
+                self.get_page(page_name).lower()
+                self.after_idle(self._warm_next_page)
+                return
+
+    def on_close(self):
+        """Writes any pending stats to disk before the window closes."""
+        if self._input_tick is not None:
+            self.after_cancel(self._input_tick)
+            self._commit_input()
+        StatsTracker.flush_data()
+        self.destroy()
 
     def show_frame(self, page_name):
-        """Show a frame and ensure its content is updated."""
-        frame = self.frames[page_name]
-        
-        # Ensure data is updated on navigation
-        if hasattr(frame, 'update_display'):
-            frame.update_display()
-            
+        """Show a frame, first redrawing whatever changed while it was hidden."""
+        frame = self.get_page(page_name)
+        self.current_page = page_name
+        self._refresh_page(page_name)
         frame.tkraise()
 
+    def submit_input(self, update, *args):
+        """
+        Applies a stat update right away inside the current input batch. The batch
+        (log write, save, page redraw) is committed on the next input tick, so a burst
+        of clicks costs one commit while each click stays its own undo step.
+        """
+        if self._input_tick is None:
+            StatsTracker.begin_batch()
+            self._input_tick = self.after(INPUT_TICK_MS, self._commit_input)
+        self._input_times.append(time.perf_counter())
+        update(*args)
+
+    def _commit_input(self):
+        """Ends the input batch, redraws the visible page and records click-to-display latency."""
+        self._input_tick = None
+        with Diagnostics.timed("input commit"):
+            StatsTracker.end_batch()
+            self._refresh_visible_page()
+            self.update_idletasks()
+
+        now = time.perf_counter()
+        self.input_latencies_ms.extend((now - t) * 1000 for t in self._input_times)
+        self._input_times = []
+
+    def input_latency_summary(self):
+        """Returns {'count', 'p50', 'p95', 'max'} of recent click-to-display latencies in ms."""
+        ordered = sorted(self.input_latencies_ms)
+        if not ordered:
+            return {'count': 0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+        return {
+            'count': len(ordered),
+            'p50': ordered[len(ordered) // 2],
+            'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            'max': ordered[-1],
+        }
+
+    def _on_data_changed(self, session, event, sign):
+        """StatsTracker listener: marks pages dirty and schedules one redraw of the visible page."""
+        keys = StatsTracker.affected_keys(event)
+        for pending in self.pending_keys.values():
+            pending |= keys
+        if not self._refresh_scheduled:
+            self._refresh_scheduled = True
+            self.after_idle(self._refresh_visible_page)
+
+    def _refresh_visible_page(self):
+        self._refresh_scheduled = False
+        if self.current_page is not None:
+            self._refresh_page(self.current_page)
+
+    def _refresh_page(self, page_name):
+        keys = self.pending_keys.get(page_name)
+        if keys:
+            self.pending_keys[page_name] = set()
+            with Diagnostics.timed(f"refresh {page_name}"):
+                self.frames[page_name].refresh(keys)
+
     def reset_data(self):
         if messagebox.askyesno("Reset Confirmation", "Are you sure you want to RESET ALL GAME DATA? This action cannot be undone."):
             StatsTracker.reset_all_stats()
-            self.frames['ScoreboardPage'].update_player_buttons() 
             self.show_frame("HomePage")
 
     def undo_action(self):
@@ -74,10 +210,41 @@ class BasketballApp(tk.Tk):
             messagebox.showinfo("Undo Success", "Last action reverted.")
         else:
             messagebox.showinfo("Undo Failed", "Action history is empty or action failed to revert.")
-        
-        self.frames['HomePage'].update_display()
-        self.frames['ScoreboardPage'].update_display()
-        self.frames['PlayerStatsPage'].update_display()
+
+    def redo_action(self):
+        if StatsTracker.redo_last_action():
+            messagebox.showinfo("Redo Success", "Undone action re-applied.")
+        else:
+            messagebox.showinfo("Redo Failed", "There is no undone action to redo.")
+
+    def toggle_diagnostics(self, event=None):
+        """Opens the diagnostics panel, or closes it if it is already open."""
+        if self.diagnostics_window is not None:
+            self.diagnostics_window.close()
+        else:
+            self.diagnostics_window = DiagnosticsWindow(self)
+
+
+# Player stat buttons on the scoreboard: (text, stat key, background color)
+PLAYER_STAT_BUTTONS = [
+    # Scoring/Shooting Stats (Made/Missed)
+    ("FT M", "FT_Made", 'lightgreen'), ("FT A", "FT_Attempted", 'lightcoral'),
+    ("2P M", "2P_Made", 'lightgreen'), ("2P A", "2P_Attempted", 'lightcoral'),
+    ("3P M", "3P_Made", 'lightgreen'), ("3P A", "3P_Attempted", 'lightcoral'),
+    # Other Stats
+    ("ORB", "Off_Rebounds", 'lightblue'), ("DRB", "Def_Rebounds", 'lightblue'),
+    ("A", "Assists", None), ("STL", "Steals", None), ("BLK", "Blocks", None),
+    ("TO", "Turnovers", 'orange'), ("F", "Fouls", 'red'),
+]
+
+
+# Box score columns on the player stats page: (column id, heading, width)
+BOX_SCORE_COLUMNS = [
+    ('number', "#", 35), ('name', "Player Name", 150), ('PTS', "PTS", 45), ('A', "A", 40),
+    ('STL', "STL", 40), ('BLK', "BLK", 40), ('TO', "TO", 40), ('Fouls', "Fouls", 45),
+    ('ORB', "ORB", 40), ('DRB', "DRB", 40), ('FT_PCT', "FT%", 50), ('2P_PCT', "2P%", 50), ('3P_PCT', "3P%", 50),
+]
+GAME_PERIOD_CHOICE = "Game"  # Period filter choice for whole-game stats
 
 
 # --- HOME PAGE ---
@@ -106,7 +273,10 @@ class HomePage(tk.Frame):
                   
         tk.Button(self, text="↩️ UNDO LAST ACTION",
                   command=controller.undo_action,
-                  fg="orange").pack(pady=20)
+                  fg="orange").pack(pady=(20, 5))
+        tk.Button(self, text="↪️ REDO LAST UNDONE ACTION",
+                  command=controller.redo_action,
+                  fg="orange").pack()
                   
         tk.Button(self, text="⚠️ RESET ALL STATS (Start New Game)",
                   command=controller.reset_data,
@@ -118,6 +288,10 @@ class HomePage(tk.Frame):
         self.score_label.config(text=f"Reeths-Puffer: {score['Team1']} vs Team 2: {score['Team2']}")
         self.quarter_label.config(text=f"Current Period: {quarter}")
 
+    def refresh(self, keys):
+        if keys & {'all', 'score', 'quarter'}:
+            self.update_display()
+
 
 # --- ROSTER MANAGEMENT PAGE (Reeths-Puffer Only) ---
 class RosterManagementPage(tk.Frame):
@@ -180,8 +354,6 @@ class RosterManagementPage(tk.Frame):
         StatsTracker.update_roster(name, 'Team1', number, is_starter)
         messagebox.showinfo("Success", f"Player '{name}' added/updated for Reeths-Puffer.")
         
-        self.controller.frames['ScoreboardPage'].update_player_buttons() 
-        self.update_display()
         self.name_entry.delete(0, tk.END)
         self.number_entry.delete(0, tk.END)
         self.starter_var.set(False)
@@ -198,9 +370,6 @@ class RosterManagementPage(tk.Frame):
         if messagebox.askyesno("Confirm Removal", f"Are you sure you want to remove '{player_name}'? All stats will be lost."):
             StatsTracker.remove_player(player_name)
             messagebox.showinfo("Removed", f"Player '{player_name}' removed.")
-            
-            self.controller.frames['ScoreboardPage'].update_player_buttons() 
-            self.update_display()
 
     def update_display(self):
         for widget in self.roster_frame.winfo_children():
@@ -226,6 +395,10 @@ class RosterManagementPage(tk.Frame):
         self.roster_frame.update_idletasks()
         self.canvas.config(scrollregion=self.canvas.bbox("all"))
 
+    def refresh(self, keys):
+        if keys & {'all', 'roster'}:
+            self.update_display()
+
 
 # --- SCOREBOARD PAGE ---
 class ScoreboardPage(tk.Frame):
@@ -255,22 +428,21 @@ class ScoreboardPage(tk.Frame):
         tk.Button(quarter_control_frame, text="Next Q", command=self.advance_quarter).pack(side=tk.LEFT, padx=5)
         tk.Button(quarter_control_frame, text="Prev Q", command=self.previous_quarter).pack(side=tk.LEFT, padx=5)
 
-        # 3. End of Quarter Score Input
-        eoc_frame = tk.LabelFrame(top_frame, text="Set End-of-Period Score", padx=5, pady=2)
-        eoc_frame.pack(side=tk.LEFT, padx=15)
-        
-        tk.Label(eoc_frame, text="T1:").pack(side=tk.LEFT)
-        self.t1_eoc_entry = tk.Entry(eoc_frame, width=3)
-        self.t1_eoc_entry.pack(side=tk.LEFT)
-        
-        tk.Label(eoc_frame, text="T2:").pack(side=tk.LEFT, padx=5)
-        self.t2_eoc_entry = tk.Entry(eoc_frame, width=3)
-        self.t2_eoc_entry.pack(side=tk.LEFT)
-        
-        tk.Button(eoc_frame, text="Record Score", command=self.record_eoc_score).pack(side=tk.LEFT, padx=5)
+        # 3. Game Clock and Shot Clock
+        clock_frame = tk.LabelFrame(top_frame, text="Clock / Shot", padx=5, pady=2)
+        clock_frame.pack(side=tk.LEFT, padx=10)
+        self.game_clock_label = tk.Label(clock_frame, text="", font=controller.stat_font, width=5)
+        self.game_clock_label.pack(side=tk.LEFT)
+        self.shot_clock_label = tk.Label(clock_frame, text="", font=controller.stat_font, fg="red", width=3)
+        self.shot_clock_label.pack(side=tk.LEFT)
+        self.clock_button = tk.Button(clock_frame, text="Start", width=5, command=self.toggle_clock)
+        self.clock_button.pack(side=tk.LEFT, padx=2)
+        tk.Button(clock_frame, text="Shot ↺", command=self.reset_shot_clock).pack(side=tk.LEFT, padx=2)
+        self.clock_tick_id = None
 
         # 4. Navigation Buttons
         tk.Button(top_frame, text="↩️ UNDO", command=controller.undo_action, fg="orange").pack(side=tk.RIGHT, padx=5)
+        tk.Button(top_frame, text="↪️ REDO", command=controller.redo_action, fg="orange").pack(side=tk.RIGHT, padx=5)
         tk.Button(top_frame, text="🏠 Home", command=lambda: controller.show_frame("HomePage")).pack(side=tk.RIGHT, padx=5)
 
 
@@ -299,8 +471,36 @@ class ScoreboardPage(tk.Frame):
         ttk.Separator(team_generic_container, orient=tk.HORIZONTAL).pack(fill='x', pady=5)
         self._create_team2_generic_stats_row(team_generic_container)
 
+        # Pool of player rows keyed by player name, in display order
+        self.player_rows = {}
+        self.player_row_order = []
         self.update_player_buttons()
         self.update_display() # Initial display update
+        self._update_clock_display()
+
+    # --- Game Clock ---
+    def toggle_clock(self):
+        self.controller.game_clock.toggle()
+        self._update_clock_display()
+
+    def reset_shot_clock(self):
+        self.controller.game_clock.reset_shot_clock()
+        self._update_clock_display()
+
+    def _update_clock_display(self):
+        """Redraws both clocks and, while running, wakes up again only when a displayed digit changes."""
+        if self.clock_tick_id is not None:
+            self.after_cancel(self.clock_tick_id)
+            self.clock_tick_id = None
+
+        clock = self.controller.game_clock
+        self.game_clock_label.config(text=GameClock.format_game_clock(clock.game.tenths()))
+        self.shot_clock_label.config(text=GameClock.format_shot_clock(clock.shot.tenths()))
+        self.clock_button.config(text="Stop" if clock.running else "Start")
+
+        delay_s = clock.next_display_change()
+        if delay_s is not None:
+            self.clock_tick_id = self.after(int(delay_s * 1000) + 1, self._update_clock_display)
 
     # --- Quarter Navigation Logic ---
     def advance_quarter(self):
@@ -313,11 +513,10 @@ class ScoreboardPage(tk.Frame):
                 next_q = quarters[current_index + 1]
                 StatsTracker.set_current_quarter(next_q)
                 messagebox.showinfo("Quarter Change", f"Advanced to {next_q}")
-            else: # Must be Q4 or OT
-                next_ot_num = StatsTracker.game_data['next_ot_num']
-                next_q = f"OT{next_ot_num}"
+            else: # Q4 goes to the first overtime
+                next_q = "OT1"
                 StatsTracker.set_current_quarter(next_q)
-                messagebox.showinfo("Quarter Change", f"Advanced to {next_q}. Remember to record end of quarter score for Q4/OT.")
+                messagebox.showinfo("Quarter Change", f"Advanced to {next_q}")
         except ValueError:
              # Handle advancing from OT
             if current_q.startswith('OT'):
@@ -327,9 +526,15 @@ class ScoreboardPage(tk.Frame):
                 messagebox.showinfo("Quarter Change", f"Advanced to {next_q}")
             else:
                 messagebox.showerror("Error", "Cannot automatically determine next quarter.")
-                
-        self.update_display()
-        self.controller.frames['PlayerStatsPage'].update_display()
+
+        self._reset_clock_for_period(current_q)
+
+    def _reset_clock_for_period(self, previous_q):
+        """After a period change (either way), the clock shows a full, stopped period."""
+        new_q = StatsTracker.get_current_quarter()
+        if new_q != previous_q:
+            self.controller.game_clock.start_period(new_q)
+            self._update_clock_display()
 
     def previous_quarter(self):
         current_q = StatsTracker.get_current_quarter()
@@ -357,40 +562,9 @@ class ScoreboardPage(tk.Frame):
                 messagebox.showerror("Error", "Cannot automatically determine previous quarter.")
         except Exception as e:
             messagebox.showerror("Error", f"Error reverting quarter: {e}")
-            
-        self.update_display()
-        self.controller.frames['PlayerStatsPage'].update_display()
-
-    def record_eoc_score(self):
-        t1_score_str = self.t1_eoc_entry.get().strip()
-        t2_score_str = self.t2_eoc_entry.get().strip()
-        current_q = StatsTracker.get_current_quarter()
-        
-        try:
-            t1_score = int(t1_score_str)
-            t2_score = int(t2_score_str)
-            
-            # Simple check against current live score
-            if t1_score < StatsTracker.game_data['team_score']['Team1'] or t2_score < StatsTracker.game_data['team_score']['Team2']:
-                 messagebox.showwarning("Score Error", "Cumulative End-of-Quarter Score cannot be less than the current live score.")
-                 return
 
-            StatsTracker.set_end_of_quarter_score(current_q, t1_score, t2_score)
-            
-            messagebox.showinfo("Score Recorded", f"Cumulative score ({t1_score}-{t2_score}) recorded for end of {current_q}. Quarter score calculated.")
-            
-            self.t1_eoc_entry.delete(0, tk.END)
-            self.t2_eoc_entry.delete(0, tk.END)
-            
-            self.update_display()
-            self.controller.frames['PlayerStatsPage'].update_display()
-            
-        except ValueError:
-            messagebox.showerror("Input Error", "Scores must be valid integers.")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {e}")
+        self._reset_clock_for_period(current_q)
 
-    # --- TEAM COMPARISON DISPLAY ---
     def _create_team_comparison_display(self):
         """Initializes the labels for the Team Totals Comparison frame."""
         self.t_labels = {}
@@ -445,10 +619,6 @@ class ScoreboardPage(tk.Frame):
 
     # --- UTILITY AND OTHER ROWS ---
 
-    def _clear_frame(self, frame):
-        for widget in frame.winfo_children():
-            widget.destroy()
-
     def _create_stats_scroll_frame(self, parent, title):
         """Creates a scrollable frame structure for one team's stats entry."""
         container = tk.LabelFrame(parent, text=title, padx=5, pady=5)
@@ -524,60 +694,61 @@ class ScoreboardPage(tk.Frame):
         create_stat_button(team2_generic_frame, "TO", "Turnovers", 1).pack(side=tk.LEFT, padx=1)
         create_stat_button(team2_generic_frame, "F", "Fouls", 1).pack(side=tk.LEFT, padx=1)
 
-    def update_player_buttons(self):
-        self._clear_frame(self.team1_player_frame.players_inner_frame)
-        
-        # Helper to create buttons for a single player
-        def create_player_row(parent_frame, player_data):
-            player_name = player_data['name']
-            
-            player_row = tk.Frame(parent_frame)
-            player_row.pack(fill="x", pady=2, padx=2)
-            
-            display_name = f"#{player_data['number']} {player_name}"
-            tk.Label(player_row, text=display_name, width=15, anchor='w', font=self.controller.stat_font).pack(side=tk.LEFT, padx=2)
-            
-            # Helper for Stat Buttons
-            def create_stat_button(parent, text, stat_key, value, player_name, color=None):
-                btn = tk.Button(parent, text=text, width=4, 
-                                 command=lambda: self.update_player_stat_and_refresh(player_name, stat_key, value))
-                if color: btn.config(bg=color)
-                return btn
-
-            # Scoring/Shooting Stats (Made/Missed)
-            create_stat_button(player_row, "FT M", "FT_Made", 1, player_name, 'lightgreen').pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "FT A", "FT_Attempted", 1, player_name, 'lightcoral').pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "2P M", "2P_Made", 1, player_name, 'lightgreen').pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "2P A", "2P_Attempted", 1, player_name, 'lightcoral').pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "3P M", "3P_Made", 1, player_name, 'lightgreen').pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "3P A", "3P_Attempted", 1, player_name, 'lightcoral').pack(side=tk.LEFT, padx=1)
-
-            # Other Stats
-            create_stat_button(player_row, "ORB", "Off_Rebounds", 1, player_name, 'lightblue').pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "DRB", "Def_Rebounds", 1, player_name, 'lightblue').pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "A", "Assists", 1, player_name).pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "STL", "Steals", 1, player_name).pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "BLK", "Blocks", 1, player_name).pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "TO", "Turnovers", 1, player_name, 'orange').pack(side=tk.LEFT, padx=1)
-            create_stat_button(player_row, "F", "Fouls", 1, player_name, 'red').pack(side=tk.LEFT, padx=1)
+    def _create_player_row(self, player_data):
+        """Builds the label and stat buttons for one player. Rows are created once and reused."""
+        player_name = player_data['name']
+        player_row = tk.Frame(self.team1_player_frame.players_inner_frame)
+
+        name_label = tk.Label(player_row, text=f"#{player_data['number']} {player_name}", width=15, anchor='w', font=self.controller.stat_font)
+        name_label.pack(side=tk.LEFT, padx=2)
+
+        for text, stat_key, color in PLAYER_STAT_BUTTONS:
+            btn = tk.Button(player_row, text=text, width=4,
+                            command=lambda k=stat_key: self.update_player_stat_and_refresh(player_name, k, 1))
+            if color: btn.config(bg=color)
+            btn.pack(side=tk.LEFT, padx=1)
 
+        return {'frame': player_row, 'label': name_label, 'number': player_data['number']}
 
+    def update_player_buttons(self):
+        """
+        Syncs the player rows with the roster: only rows for added or removed players
+        are created or destroyed, changed numbers are relabeled in place, and rows
+        are repacked only when the order changed.
+        """
         team1_players = StatsTracker.get_roster("Team1")
         team1_players.sort(key=lambda p: p['number'])
-        
-        for player in team1_players:
-            create_player_row(self.team1_player_frame.players_inner_frame, player)
-            
-        self.team1_player_frame.players_inner_frame.update_idletasks()
-        self.team1_player_frame.canvas.config(scrollregion=self.team1_player_frame.canvas.bbox("all"))
+        roster_names = {player['name'] for player in team1_players}
 
+        for name in [n for n in self.player_rows if n not in roster_names]:
+            self.player_rows.pop(name)['frame'].destroy()
+
+        for player in team1_players:
+            row = self.player_rows.get(player['name'])
+            if row is None:
+                self.player_rows[player['name']] = self._create_player_row(player)
+            elif row['number'] != player['number']:
+                row['label'].config(text=f"#{player['number']} {player['name']}")
+                row['number'] = player['number']
+
+        order = [player['name'] for player in team1_players]
+        if order != self.player_row_order:
+            for name in self.player_row_order:
+                if name in self.player_rows:
+                    self.player_rows[name]['frame'].pack_forget()
+            for name in order:
+                self.player_rows[name]['frame'].pack(fill="x", pady=2, padx=2)
+            self.player_row_order = order
+
+            self.team1_player_frame.players_inner_frame.update_idletasks()
+            self.team1_player_frame.canvas.config(scrollregion=self.team1_player_frame.canvas.bbox("all"))
+
+    # Clicks go through the app's input batch; the page redraws once per input tick
     def update_player_stat_and_refresh(self, player_name, stat_key, value):
-        StatsTracker.update_player_stat(player_name, stat_key, value)
-        self.update_display() 
+        self.controller.submit_input(StatsTracker.update_player_stat, player_name, stat_key, value)
 
     def update_team_generic_stat_and_refresh(self, team_name, stat_key, value):
-        StatsTracker.update_team_generic_stat(team_name, stat_key, value)
-        self.update_display()
+        self.controller.submit_input(StatsTracker.update_team_generic_stat, team_name, stat_key, value)
         
     def update_display(self):
         score = StatsTracker.get_current_score()
@@ -598,7 +769,12 @@ class ScoreboardPage(tk.Frame):
         
         # Update Team Totals Comparison
         self._update_team_comparison_display()
-        self.controller.frames['HomePage'].update_display()
+
+    def refresh(self, keys):
+        if keys & {'all', 'roster'}:
+            self.update_player_buttons()
+        if keys & {'all', 'score', 'quarter', 'team1', 'team2'}:
+            self.update_display()
 
 
 # --- PLAYER STATS PAGE ---
@@ -616,21 +792,40 @@ class PlayerStatsPage(tk.Frame):
         self.quarterly_frame.pack(fill='x', padx=10, pady=10)
         self.quarter_labels = []
 
-        # --- PLAYER STATS SCROLLABLE AREA ---
-        tk.Label(self, text="Reeths-Puffer Player Stats:", font=controller.stat_font).pack(side="top", fill="x", pady=5)
-        self.canvas = tk.Canvas(self)
-        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas)
-
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        self.canvas.pack(side="top", fill="both", expand=True)
+        # --- PLAYER STATS BOX SCORE ---
+        heading_frame = tk.Frame(self)
+        heading_frame.pack(side="top", fill="x", pady=5)
+        tk.Label(heading_frame, text="Reeths-Puffer Player Stats:", font=controller.stat_font).pack(side=tk.LEFT, expand=True)
+
+        # Period filter: the whole game, a half, all overtimes or a single period
+        tk.Label(heading_frame, text="Show:").pack(side=tk.LEFT)
+        self.period_var = tk.StringVar(value=GAME_PERIOD_CHOICE)
+        self.period_choice = ttk.Combobox(heading_frame, textvariable=self.period_var, state="readonly", width=6,
+                                          values=[GAME_PERIOD_CHOICE])
+        self.period_choice.bind("<<ComboboxSelected>>", lambda event: self.select_period(self.period_var.get()))
+        self.period_choice.pack(side=tk.LEFT, padx=10)
+        self.period_filter = None  # None: whole game
+        table_frame = tk.Frame(self)
+        table_frame.pack(side="top", fill="both", expand=True, padx=10)
+
+        columns = [column for column, _, _ in BOX_SCORE_COLUMNS]
+        self.box_score = ttk.Treeview(table_frame, columns=columns, show="headings")
+        for column, heading, width in BOX_SCORE_COLUMNS:
+            self.box_score.heading(column, text=heading, command=lambda c=column: self.sort_by_column(c))
+            self.box_score.column(column, width=width, anchor='w' if column == 'name' else 'e', stretch=column == 'name')
+        self.box_score.tag_configure('starter', background="#f0f0ff")
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.box_score.yview)
+        self.box_score.configure(yscrollcommand=self.scrollbar.set)
+        self.box_score.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
-        
-        self.results_labels = []
+
+        # Rows are keyed by player name; only rows whose values changed are rewritten
+        self.row_values = {}
+        self.row_tags = {}  # The 'starter' tag is part of a row's state too
+        self.row_order = []
+        self.sort_column = None  # None: points, then assists, then defensive rebounds
+        self.sort_descending = True
 
         # Team 2 Summary at the bottom
         self.team2_summary_label = tk.Label(self, text="", font=controller.stat_font, justify=tk.LEFT)
@@ -646,6 +841,7 @@ class PlayerStatsPage(tk.Frame):
         self.quarter_labels = []
         
         breakdown = StatsTracker.get_quarterly_score_breakdown()
+        self._update_period_choices(breakdown)
         
         if not breakdown:
              tk.Label(self.quarterly_frame, text="No quarter scores recorded yet.", fg="gray").pack()
@@ -689,69 +885,102 @@ class PlayerStatsPage(tk.Frame):
         self.quarter_labels.append(total_label)
 
 
+    def _update_period_choices(self, breakdown):
+        labels = [item['label'] for item in breakdown]
+        choices = [GAME_PERIOD_CHOICE] + list(StatsTracker.PERIOD_GROUPS)
+        if any(label.startswith('OT') for label in labels):
+            choices.append('OT')
+        self.period_choice.config(values=choices + labels)
+
+    def select_period(self, choice):
+        """Limits the box score and the Team 2 summary to one period or period group."""
+        self.period_filter = None if choice == GAME_PERIOD_CHOICE else choice
+        self._update_box_score()
+        self._update_team2_summary()
+
+    def _player_row_values(self, stats):
+        return (
+            stats['number'], stats['name'], stats['Points'], stats['Assists'], stats['Steals'],
+            stats['Blocks'], stats['Turnovers'], stats['Fouls'], stats['Off_Rebounds'], stats['Def_Rebounds'],
+            f"{stats['FT_PCT']:.1f}", f"{stats['2P_PCT']:.1f}", f"{stats['3P_PCT']:.1f}",
+        )
+
+    def _sorted_names(self, standings):
+        """Player names in display order for the current sort column."""
+        if self.sort_column is None:
+            standings = sorted(standings, key=lambda item: (-item['Points'], -item['Assists'], -item['Def_Rebounds']))
+        else:
+            index = [column for column, _, _ in BOX_SCORE_COLUMNS].index(self.sort_column)
+            values = self.row_values
+            numeric = self.sort_column != 'name'
+            standings = sorted(standings, reverse=self.sort_descending,
+                               key=lambda item: float(values[item['name']][index]) if numeric else values[item['name']][index].lower())
+        return [item['name'] for item in standings]
+
+    def _update_box_score(self):
+        """Inserts, updates or deletes only the rows that changed, then reorders if needed."""
+        standings = StatsTracker.get_player_data(self.period_filter)
+        names = {item['name'] for item in standings}
+
+        for name in [n for n in self.row_values if n not in names]:
+            self.box_score.delete(name)
+            del self.row_values[name]
+            del self.row_tags[name]
+
+        for stats in standings:
+            values = self._player_row_values(stats)
+            tags = ('starter',) if stats['starter'] else ()
+            if stats['name'] not in self.row_values:
+                self.box_score.insert('', 'end', iid=stats['name'], values=values, tags=tags)
+            elif (self.row_values[stats['name']], self.row_tags[stats['name']]) != (values, tags):
+                self.box_score.item(stats['name'], values=values, tags=tags)
+            else:
+                continue
+            self.row_values[stats['name']] = values
+            self.row_tags[stats['name']] = tags
+
+        order = self._sorted_names(standings)
+        if order != self.row_order:
+            # Move only the rows that are out of place (a scored basket usually moves one row)
+            current = list(self.box_score.get_children())
+            for index, name in enumerate(order):
+                if current[index] != name:
+                    current.remove(name)
+                    current.insert(index, name)
+                    self.box_score.move(name, '', index)
+            self.row_order = order
+
+    def sort_by_column(self, column):
+        """Sorts the box score by a column; clicking the same column again flips the direction."""
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = column != 'name'
+        self.row_order = []
+        self._update_box_score()
+
     def update_display(self):
         # 1. Update Quarterly Breakdown
         self._update_quarterly_breakdown()
         
-        # 2. Clear and update Player Stats
-        for label in self.results_labels:
-            label.destroy()
-        self.results_labels = []
-
-        standings = StatsTracker.get_player_data()
-        standings.sort(key=lambda item: (-item['Points'], -item['Assists'], -item['Def_Rebounds']))
-        
-        # Player Header
-        header_text = (
-            f"{'#':<3}"
-            f"{'Player Name':<18}"
-            f"{'PTS':>5}"
-            f"{'A':>4}"
-            f"{'STL':>4}"
-            f"{'BLK':>4}"
-            f"{'TO':>4}"
-            f"{'Fouls':>5}"
-            f"{'ORB':>4}"
-            f"{'DRB':>4}"
-            f"{'FT%':>5}"
-            f"{'2P%':>5}"
-            f"{'3P%':>5}"
-        )
-        header = tk.Label(self.scrollable_frame, 
-                          text=header_text, 
-                          font=self.mono_font, 
-                          anchor='w', bg="#e0e0e0")
-        header.pack(fill='x', padx=5, pady=5)
-        self.results_labels.append(header)
-        
-        # Player Data
-        for stats in standings:
-            bg_color = "#f0f0ff" if stats['starter'] else "white" 
-            
-            text = (
-                f"{stats['number']:<3}"
-                f"{stats['name'][:17]:<18}"
-                f"{stats['Points']:>5}"
-                f"{stats['Assists']:>4}"
-                f"{stats['Steals']:>4}"
-                f"{stats['Blocks']:>4}"
-                f"{stats['Turnovers']:>4}"
-                f"{stats['Fouls']:>5}"
-                f"{stats['Off_Rebounds']:>4}"
-                f"{stats['Def_Rebounds']:>4}"
-                f"{stats['FT_PCT']:>5.1f}"
-                f"{stats['2P_PCT']:>5.1f}"
-                f"{stats['3P_PCT']:>5.1f}"
-            )
-            label = tk.Label(self.scrollable_frame, text=text, anchor='w', font=self.mono_font, bg=bg_color)
-            label.pack(fill='x', padx=5)
-            self.results_labels.append(label)
-        
-        self.scrollable_frame.update_idletasks()
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        # 2. Update Player Stats in place
+        self._update_box_score()
 
         # 3. TEAM 2 GENERIC STATS Summary
-        team2_stats = StatsTracker.get_team_stats('Team2')
+        self._update_team2_summary()
+
+    def refresh(self, keys):
+        everything = 'all' in keys
+        if everything or keys & {'score', 'quarter', 'quarterly_scores'}:
+            self._update_quarterly_breakdown()
+        if everything or 'roster' in keys or any(key.startswith('player:') for key in keys):
+            self._update_box_score()
+        if everything or 'team2' in keys:
+            self._update_team2_summary()
+
+    def _update_team2_summary(self):
+        team2_stats = StatsTracker.get_team_stats('Team2', self.period_filter)
         
         def calculate_team_pct(made_key, attempted_key):
             made = team2_stats.get(made_key, 0)
@@ -763,7 +992,7 @@ class PlayerStatsPage(tk.Frame):
         threep_pct = calculate_team_pct('3P_Made', '3P_Attempted')
         
         t2_summary = (
-            f"--- Team 2 Summary ---\n"
+            f"--- Team 2 Summary ({self.period_filter or GAME_PERIOD_CHOICE}) ---\n"
             f"PTS: {team2_stats.get('Points', 0)} | "
             f"FGM/A (FT/2P/3P): "
             f"{team2_stats.get('FT_Made', 0)}/{team2_stats.get('FT_Attempted', 0)} ({ft_pct}%) | "
@@ -797,6 +1026,7 @@ class IntermissionPage(tk.Frame):
         self.time_start = 0 
         self.time_left_s = 0
         self.timer_id = None    
+        self.countdown = None  # GameClock.Countdown; time_left_s is derived from it
         
         # Image map logic is kept but requires images in the directory
         self.image_map = {
@@ -806,11 +1036,17 @@ class IntermissionPage(tk.Frame):
         }
         self.current_image_ref = None 
 
+        # Decoded stage images, and their pre-scaled variants keyed by (stage, subsample factor)
+        self.original_images = {}
+        self.scaled_images = {}
+        self.current_image_key = None
+
         tk.Label(self, text="Intermission / Timeout", font=controller.title_font).pack(side="top", fill="x", pady=10)
         self.timer_label = tk.Label(self, text=self._format_time(), font=controller.title_font, fg="red")
         self.timer_label.pack(pady=10)
         self.image_label = tk.Label(self)
         self.image_label.pack()
+        self.bind("<Configure>", self._on_resize)
 
         # Create buttons dynamically from time options
         button_frame = tk.Frame(self)
@@ -830,45 +1066,89 @@ class IntermissionPage(tk.Frame):
             
         self.time_start = start_time_s # Set the new starting time
         self.time_left_s = start_time_s
+        self.countdown = GameClock.Countdown(start_time_s)
+        self.countdown.start()
+        self.timer_label.config(fg="red")
+        self.preload_images()
         self.update_timer()
 
-    def _update_image(self):
-        """Updates the Pokemon image based on the time remaining."""
-        image_file = None
-        
+    def _current_stage(self):
+        """Returns the image_map stage for the time remaining."""
         # If timer is short (<= 60s), use a smaller Blastoise threshold (5 seconds)
         # Otherwise (for 10m/20m), use 30 seconds
         blastoise_threshold = 5 if self.time_start <= 60 else 30 
-        
-        if self.time_left_s <= 0:
-            image_file = self.image_map['Blastoise']['file']
-        elif self.time_left_s <= blastoise_threshold:
-            image_file = self.image_map['Blastoise']['file']
+
+        if self.time_left_s <= blastoise_threshold:
+            return 'Blastoise'
         elif self.time_left_s <= self.time_start / 2:
-            image_file = self.image_map['Wartortle']['file']
-        else:
-            image_file = self.image_map['Squirtle']['file']
-        
-        try:
-            # NOTE: If this fails, it's because you don't have the image files in your directory.
-            new_image_ref = tk.PhotoImage(file=resource_path(image_file))
-            self.image_label.config(image=new_image_ref)
-            self.current_image_ref = new_image_ref
-        except tk.TclError:
-            self.image_label.config(image='', text=f"Error: {image_file} not found")
-            self.current_image_ref = None
+            return 'Wartortle'
+        return 'Squirtle'
+
+    def _load_stage_image(self, stage):
+        """Decodes a stage's PNG once; returns None if the file is missing."""
+        if stage not in self.original_images:
+            try:
+                # NOTE: If this fails, it's because you don't have the image files in your directory.
+                self.original_images[stage] = tk.PhotoImage(file=resource_path(self.image_map[stage]['file']))
+            except tk.TclError:
+                self.original_images[stage] = None
+        return self.original_images[stage]
+
+    def _scale_factor(self, image):
+        """Integer subsample factor that fits the image in the space the page leaves for it."""
+        available = max(IMAGE_MIN_HEIGHT, self.winfo_height() - IMAGE_RESERVED_HEIGHT)
+        return max(1, math.ceil(image.height() / available))
+
+    def preload_images(self):
+        """Decodes and pre-scales every stage image for the current window size."""
+        for stage in self.image_map:
+            image = self._load_stage_image(stage)
+            if image is not None:
+                self._scaled_image(stage, image, self._scale_factor(image))
+
+    def _scaled_image(self, stage, image, factor):
+        key = (stage, factor)
+        if key not in self.scaled_images:
+            self.scaled_images[key] = image.subsample(factor) if factor > 1 else image
+        return self.scaled_images[key]
+
+    def _update_image(self):
+        """Shows the Pokemon image for the time remaining; the label only changes on a stage transition or resize."""
+        stage = self._current_stage()
+        image = self._load_stage_image(stage)
+
+        if image is None:
+            if self.current_image_key != (stage, None):
+                self.image_label.config(image='', text=f"Error: {self.image_map[stage]['file']} not found")
+                self.current_image_ref = None
+                self.current_image_key = (stage, None)
+            return
+
+        factor = self._scale_factor(image)
+        if self.current_image_key == (stage, factor):
+            return
+
+        self.current_image_ref = self._scaled_image(stage, image, factor)
+        self.image_label.config(image=self.current_image_ref, text='')
+        self.current_image_key = (stage, factor)
+
+    def _on_resize(self, event):
+        if event.widget is self and self.current_image_key is not None:
+            self._update_image()
 
     def update_timer(self):
-        """Decrements the timer and schedules the next update."""
+        """Shows the time left and schedules the next update for when the displayed second changes."""
+        self.time_left_s = math.ceil(self.countdown.remaining())
         if self.time_left_s > 0:
-            self.time_left_s -= 1
             self.timer_label.config(text=self._format_time())
             
             self._update_image()
             
-            # Schedule this function to run again after 1000ms (1 second)
-            self.timer_id = self.after(1000, self.update_timer)
+            # Wake up just after the next whole second; late callbacks can't make the timer drift
+            delay_s = self.countdown.seconds_until_change(1.0)
+            self.timer_id = self.after(int(delay_s * 1000) + 1, self.update_timer)
         else:
+            self.timer_id = None
             # Timer is done!
             self.timer_label.config(text="Time's Up!", fg="blue")
             self._update_image() # Final image update
@@ -882,9 +1162,125 @@ class IntermissionPage(tk.Frame):
     def _stop_timer_and_navigate(self, page_name):
         if self.timer_id:
             self.after_cancel(self.timer_id)
+            self.timer_id = None
+        if self.countdown is not None:
+            self.countdown.pause()
         self.controller.show_frame(page_name)
 
 
+# --- DIAGNOSTICS PANEL ---
+DIAGNOSTICS_COLUMNS = [
+    ('name', "Operation", 220), ('count', "Calls", 60), ('p50', "p50 ms", 70), ('p95', "p95 ms", 70),
+    ('p99', "p99 ms", 70), ('max', "Max ms", 70), ('total_ms', "Total ms", 80),
+]
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    """Timing tables and histograms from Diagnostics, plus trace export."""
+
+    def __init__(self, controller):
+        tk.Toplevel.__init__(self, controller)
+        self.controller = controller
+        self.title("Diagnostics")
+        self.geometry("720x520")
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        controls = tk.Frame(self)
+        controls.pack(fill='x', padx=10, pady=5)
+        self.enabled_var = tk.BooleanVar(value=Diagnostics.is_enabled())
+        tk.Checkbutton(controls, text="Record timings", variable=self.enabled_var,
+                       command=self.toggle_recording).pack(side=tk.LEFT)
+        tk.Button(controls, text="Clear", command=self.clear).pack(side=tk.LEFT, padx=5)
+        tk.Button(controls, text="Export CSV", command=lambda: self.export('csv')).pack(side=tk.RIGHT, padx=5)
+        tk.Button(controls, text="Export JSON", command=lambda: self.export('json')).pack(side=tk.RIGHT, padx=5)
+
+        tk.Label(self, text=controller.startup_report(), font=controller.stat_font, anchor='w').pack(fill='x', padx=10)
+        self.latency_label = tk.Label(self, text="", font=controller.stat_font, anchor='w')
+        self.latency_label.pack(fill='x', padx=10)
+
+        columns = [column for column, _, _ in DIAGNOSTICS_COLUMNS]
+        self.table = ttk.Treeview(self, columns=columns, show="headings", height=12)
+        for column, heading, width in DIAGNOSTICS_COLUMNS:
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=width, anchor='w' if column == 'name' else 'e', stretch=column == 'name')
+        self.table.pack(fill='both', expand=True, padx=10, pady=5)
+        self.table.bind("<<TreeviewSelect>>", lambda event: self._update_histogram())
+
+        # Text histogram of the selected operation's recent calls
+        self.histogram_label = tk.Label(self, text="Select an operation to see its histogram.",
+                                        font=controller.mono_font, justify=tk.LEFT, anchor='w')
+        self.histogram_label.pack(fill='x', padx=10, pady=5)
+
+        self.after_id = None
+        self._refresh()
+
+    def toggle_recording(self):
+        if self.enabled_var.get():
+            Diagnostics.enable()
+        else:
+            Diagnostics.disable()
+
+    def clear(self):
+        Diagnostics.clear()
+        self.controller.input_latencies_ms.clear()
+        self._refresh(reschedule=False)
+
+    def export(self, kind):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=f".{kind}",
+                                            filetypes=[(kind.upper(), f"*.{kind}")],
+                                            initialfile=f"diagnostics.{kind}")
+        if not path:
+            return
+        ok = Diagnostics.export_json(path) if kind == 'json' else Diagnostics.export_csv(path)
+        if ok:
+            messagebox.showinfo("Export Complete", f"Timings written to {path}", parent=self)
+        else:
+            messagebox.showerror("Export Failed", f"Could not write {path}", parent=self)
+
+    def _refresh(self, reschedule=True):
+        latency = self.controller.input_latency_summary()
+        self.latency_label.config(
+            text=f"Click-to-display latency ({latency['count']} clicks): "
+                 f"p50 {latency['p50']:.1f} ms  p95 {latency['p95']:.1f} ms  max {latency['max']:.1f} ms")
+
+        rows = Diagnostics.summary()
+        names = [row['name'] for row in rows]
+        for item in self.table.get_children():
+            if item not in names:
+                self.table.delete(item)
+        for index, row in enumerate(rows):
+            values = [row['name'], row['count']] + [f"{row[key]:.2f}" for key in ('p50', 'p95', 'p99', 'max', 'total_ms')]
+            if self.table.exists(row['name']):
+                self.table.item(row['name'], values=values)
+                self.table.move(row['name'], '', index)
+            else:
+                self.table.insert('', index, iid=row['name'], values=values)
+        self._update_histogram()
+
+        if reschedule:
+            self.after_id = self.after(DIAGNOSTICS_REFRESH_MS, self._refresh)
+
+    def _update_histogram(self):
+        selection = self.table.selection()
+        if not selection:
+            return
+        buckets = Diagnostics.buckets(selection[0])
+        largest = max((count for _, count in buckets), default=0) or 1
+        lines = [f"{selection[0]} (last {sum(count for _, count in buckets)} calls)"]
+        for edge, count in buckets:
+            bound = f"<= {edge:g} ms" if edge is not None else f"> {Diagnostics.BUCKET_EDGES_MS[-1]:g} ms"
+            lines.append(f"{bound:>12} {'#' * round(count / largest * 40):<40} {count}")
+        self.histogram_label.config(text="\n".join(lines))
+
+    def close(self):
+        """Stops the redraws and closes the panel (timing keeps running if it is on)."""
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+            self.after_id = None
+        self.controller.diagnostics_window = None
+        self.destroy()
+
+
 if __name__ == "__main__":    
     app = BasketballApp()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,368 @@
+"""
+Benchmarks for the StatsTracker hot paths.
+
+Run with:  python Benchmarks.py [--results benchmark_results.json] [--ops-only]
+Every benchmark runs inside a temporary directory so real game files are never touched.
+The per-operation suite (bench_operations) saves its percentiles to the results
+file and, when the file already holds an earlier run, prints the change in p50
+next to each row so regressions show up between versions.
+"""
+import argparse
+import copy
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+import Persistence
+import StatsTracker
+
+
+def _timed(func, *args):
+    """Returns the wall time of one call in microseconds."""
+    start = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - start) * 1e6
+
+
+def _median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def _percentiles(values):
+    """p50/p95/p99 of a list of timings."""
+    ordered = sorted(values)
+    return {f"p{int(q * 100)}": ordered[min(len(ordered) - 1, int(len(ordered) * q))] for q in (0.5, 0.95, 0.99)}
+
+
+def _setup_game(roster_size, prior_events, rng):
+    """Resets the tracker to a game with roster_size players and prior_events stats logged."""
+    StatsTracker.reset_all_stats()
+    names = [f"Player {i}" for i in range(roster_size)]
+    for i, name in enumerate(names):
+        StatsTracker.update_roster(name, 'Team1', i, i < 5)
+    for _ in range(prior_events):
+        StatsTracker.update_player_stat(rng.choice(names), rng.choice(StatsTracker.STAT_KEYS_T1), 1)
+    return names
+
+
+def bench_operations(roster_sizes=(5, 15, 50), event_counts=(100, 1000, 10000), samples=200, load_samples=10):
+    """
+    Latency percentiles of the main StatsTracker operations in synthetic games
+    across roster sizes and game lengths (events already in the history), plus
+    the bytes each scenario writes to disk. Returns the rows for saving.
+    """
+    rng = random.Random(17)
+    rows = []
+    print(f"{'operation':>24} {'roster':>6} {'events':>6} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}")
+    for roster_size in roster_sizes:
+        for events in event_counts:
+            names = _setup_game(roster_size, events, rng)
+            StatsTracker.flush_data()
+            bytes_before = StatsTracker._writer.bytes_written
+
+            def undo():
+                # Timed undo, then an untimed redo so the history depth stays put
+                elapsed = _timed(StatsTracker.undo_last_action)
+                StatsTracker.redo_last_action()
+                return elapsed
+
+            timings = {
+                'update_player_stat': [_timed(StatsTracker.update_player_stat, rng.choice(names), rng.choice(StatsTracker.STAT_KEYS_T1), 1)
+                                       for _ in range(samples)],
+                'update_team_generic_stat': [_timed(StatsTracker.update_team_generic_stat, 'Team2', rng.choice(StatsTracker.TEAM_STAT_KEYS), 1)
+                                             for _ in range(samples)],
+                'undo_last_action': [undo() for _ in range(samples)],
+            }
+            StatsTracker.flush_data()
+            written = StatsTracker._writer.bytes_written - bytes_before
+            timings['get_player_data'] = [_timed(StatsTracker.get_player_data) for _ in range(samples)]
+            timings['get_team_stats'] = [_timed(StatsTracker.get_team_stats, 'Team1') for _ in range(samples)]
+            timings['load_data'] = [_timed(StatsTracker.load_data) for _ in range(load_samples)]
+            assert not StatsTracker.check_score_consistency()
+
+            for operation, values in timings.items():
+                row = {'operation': operation, 'roster': roster_size, 'events': events, **_percentiles(values)}
+                rows.append(row)
+                print(f"{operation:>24} {roster_size:>6} {events:>6} {row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f}")
+            # Every update and undo above wrote log lines; the snapshot is written once per flush
+            rows.append({'operation': 'bytes_written', 'roster': roster_size, 'events': events, 'bytes': written})
+            print(f"{'bytes written':>24} {roster_size:>6} {events:>6} {written:>9,} ({written / (samples * 4):.0f} per change)")
+    return rows
+
+
+def _row_key(row):
+    return (row['operation'], row['roster'], row['events'])
+
+
+def compare_results(rows, previous):
+    """Prints the p50 (or bytes) change of every row that also appears in an earlier run."""
+    earlier = {_row_key(row): row for row in previous.get('rows', [])}
+    print(f"Compared with the run from {previous.get('timestamp', '?')}:")
+    print(f"{'operation':>24} {'roster':>6} {'events':>6} {'before':>10} {'now':>10} {'change':>8}")
+    for row in rows:
+        old = earlier.get(_row_key(row))
+        if old is None:
+            continue
+        field = 'bytes' if 'bytes' in row else 'p50'
+        if not old.get(field):
+            continue
+        change = (row[field] - old[field]) / old[field] * 100
+        print(f"{row['operation']:>24} {row['roster']:>6} {row['events']:>6} {old[field]:>10.1f} {row[field]:>10.1f} {change:>+7.0f}%")
+
+
+def save_results(path, rows):
+    """Writes the rows of this run, then compares them against the run the file held before."""
+    previous = None
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                previous = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading earlier benchmark results: {e}")
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'rows': rows,
+    }
+    try:
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results saved to {path}")
+    except OSError as e:
+        print(f"Error saving benchmark results: {e}")
+
+    if previous:
+        print()
+        compare_results(rows, previous)
+
+
+def bench_score_updates(roster_sizes=(5, 15, 30, 50), prior_event_counts=(0, 1000, 5000), samples=300):
+    """
+    Per-event cost of update_player_stat (incremental scoring) against the cost of
+    the full _recalculate_all_scores() pass it replaced, across roster sizes and
+    game lengths. The incremental column should stay flat; the full one grows with roster size.
+    """
+    rng = random.Random(7)
+    print(f"{'roster':>6} {'events':>7} {'update us':>10} {'full recalc us':>15}")
+    for roster_size in roster_sizes:
+        for prior_events in prior_event_counts:
+            names = _setup_game(roster_size, prior_events, rng)
+            update_times = [
+                _timed(StatsTracker.update_player_stat, rng.choice(names), rng.choice(list(StatsTracker.SCORING_MAP)), 1)
+                for _ in range(samples)
+            ]
+            recalc_times = [_timed(StatsTracker._recalculate_all_scores) for _ in range(samples)]
+            assert not StatsTracker.check_score_consistency()
+            print(f"{roster_size:>6} {prior_events:>7} {_median(update_times):>10.1f} {_median(recalc_times):>15.1f}")
+
+
+def bench_read_paths(roster_sizes=(5, 15, 50, 200), samples=300):
+    """
+    Cost of the refresh-time reads (get_team_stats('Team1'), get_player_data(),
+    get_leaderboard()) with plain dicts versus the NumPy stat matrix.
+    """
+    rng = random.Random(11)
+    modes = [("dict", False)] + ([("matrix", True)] if StatsTracker.StatMatrix.available() else [])
+    print(f"{'roster':>6} {'store':>7} {'team us':>8} {'players us':>11} {'leaders us':>11}")
+    for roster_size in roster_sizes:
+        _setup_game(roster_size, roster_size * 20, rng)
+        for label, enabled in modes:
+            StatsTracker.enable_stat_matrix(enabled)
+            team = _median([_timed(StatsTracker.get_team_stats, 'Team1') for _ in range(samples)])
+            players = _median([_timed(StatsTracker.get_player_data) for _ in range(samples)])
+            leaders = _median([_timed(StatsTracker.get_leaderboard, 'Points', 5) for _ in range(samples)])
+            print(f"{roster_size:>6} {label:>7} {team:>8.1f} {players:>11.1f} {leaders:>11.1f}")
+    StatsTracker.enable_stat_matrix(False)
+
+
+def bench_input_batching(burst_sizes=(1, 2, 5, 20), samples=200):
+    """
+    Cost of a burst of stat clicks committed one by one versus inside one input
+    batch (one log append, one save and one round of notifications per burst).
+    """
+    rng = random.Random(5)
+    names = _setup_game(15, 500, rng)
+    listener = lambda session, event, sign: StatsTracker.affected_keys(event)
+    StatsTracker.add_listener(listener)
+    print(f"{'burst':>5} {'one by one us':>14} {'batched us':>11}")
+    for burst in burst_sizes:
+        def clicks():
+            for _ in range(burst):
+                StatsTracker.update_player_stat(rng.choice(names), '2P_Made', 1)
+
+        def batched_clicks():
+            with StatsTracker.batch():
+                clicks()
+
+        single = _median([_timed(clicks) for _ in range(samples)])
+        batched = _median([_timed(batched_clicks) for _ in range(samples)])
+        print(f"{burst:>5} {single:>14.1f} {batched:>11.1f}")
+    StatsTracker.remove_listener(listener)
+
+
+def _traced_bytes(func):
+    """Bytes still allocated by what func() returns (measured with tracemalloc)."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+def bench_history_memory(event_counts=(500, 1000, 2000, 5000), roster_size=15):
+    """
+    Memory held for undo/redo after a whole game of events: the delta history
+    plus checkpoints, against keeping a full game_data snapshot per action
+    (and against the old 50-snapshot cap, which held less but lost everything older).
+    """
+    rng = random.Random(13)
+    print(f"{'events':>7} {'history KB':>11} {'per event B':>12} {'snapshots KB':>13} {'50 snaps KB':>12}")
+    for events in event_counts:
+        _setup_game(roster_size, events, rng)
+        session = StatsTracker.get_default_session()
+        session.state_at(0)  # Builds the checkpoints
+        history_bytes, _ = _traced_bytes(lambda: copy.deepcopy((session.history, session._redo, session._checkpoints)))
+        # Measured twice: the first traced copy also counts one-off interpreter allocations
+        snapshot_bytes = min(_traced_bytes(lambda: copy.deepcopy(session.data))[0] for _ in range(2))
+        total = len(session.history)
+        print(f"{total:>7} {history_bytes / 1024:>11.1f} {history_bytes / total:>12.1f} "
+              f"{snapshot_bytes * total / 1024:>13.1f} {snapshot_bytes * 50 / 1024:>12.1f}")
+
+
+def bench_storage_formats(event_counts=(100, 1000, 10000), roster_size=15, samples=5):
+    """
+    File sizes and save/load times of the JSON files against the compact binary
+    format (CompactFormat), with and without zlib: the event log after a game of
+    each length, one save of the stats file, a fresh load (the saved state) and
+    the first use of the undo history after it (log replay).
+    """
+    rng = random.Random(19)
+    formats = [("json", 'json', False), ("compact", 'compact', False), ("compact+zlib", 'compact', True)]
+    print(f"{'format':>12} {'events':>6} {'log KB':>8} {'stats KB':>9} {'append us':>10} {'save ms':>8} {'load ms':>8} {'history ms':>11}")
+    compression = StatsTracker.COMPACT_COMPRESSION
+    try:
+        for events in event_counts:
+            choices = [(rng.choice(range(roster_size)), rng.choice(StatsTracker.STAT_KEYS_T1)) for _ in range(events)]
+            for label, storage_format, compress in formats:
+                StatsTracker.COMPACT_COMPRESSION = compress
+                directory = f"{label}_{events}"
+                os.makedirs(directory)
+                session = StatsTracker.GameSession(directory, storage_format=storage_format)
+                session.reset_all_stats()
+                for i in range(roster_size):
+                    session.update_roster(f"Player {i}", 'Team1', i, i < 5)
+
+                start = time.perf_counter()
+                for player, stat in choices:
+                    session.update_player_stat(f"Player {player}", stat, 1)
+                session.flush_data()
+                append_us = (time.perf_counter() - start) * 1e6 / events
+
+                save = _median([_timed(lambda: Persistence.atomic_write(session.stats_file, session._render_stats()))
+                                for _ in range(samples)]) / 1000
+                load = _median([_timed(StatsTracker.GameSession(directory, storage_format=storage_format).load_data)
+                                for _ in range(samples)]) / 1000
+                loaded = [StatsTracker.GameSession(directory, storage_format=storage_format) for _ in range(samples)]
+                for fresh in loaded:
+                    fresh.load_data()
+                history = _median([_timed(lambda: fresh.history) for fresh in loaded]) / 1000
+                log_kb = os.path.getsize(session.history_file) / 1024
+                stats_kb = os.path.getsize(session.stats_file) / 1024
+                print(f"{label:>12} {events:>6} {log_kb:>8.1f} {stats_kb:>9.1f} {append_us:>10.1f} {save:>8.2f} {load:>8.2f} {history:>11.2f}")
+    finally:
+        StatsTracker.COMPACT_COMPRESSION = compression
+
+
+def bench_scoreboard_redraw(roster_sizes=(5, 15, 30, 50), samples=20):
+    """
+    Cost of ScoreboardPage.update_player_buttons() with the row pool: an unchanged
+    roster, one player added and removed, and a full rebuild (every row created
+    from scratch, as before the pool). Needs a display; skipped without one.
+    """
+    try:
+        import BasketballGUI
+        app = BasketballGUI.BasketballApp()
+    except Exception as e:
+        print(f"Scoreboard redraw benchmark skipped: {e}")
+        return
+    app.withdraw()
+    page = app.get_page('ScoreboardPage')
+
+    def redraw(rebuild=False):
+        if rebuild:
+            # Destroy every pooled row so update_player_buttons() rebuilds them all
+            for row in page.player_rows.values():
+                row['frame'].destroy()
+            page.player_rows = {}
+            page.player_row_order = []
+        page.update_player_buttons()
+        app.update_idletasks()
+
+    print(f"{'roster':>6} {'unchanged ms':>13} {'add+remove ms':>14} {'full rebuild ms':>16}")
+    try:
+        for roster_size in roster_sizes:
+            _setup_game(roster_size, 0, random.Random(3))
+            redraw(rebuild=True)
+            unchanged = _median([_timed(redraw) for _ in range(samples)]) / 1000
+
+            def add_remove():
+                StatsTracker.update_roster("Sub", 'Team1', 99, False)
+                redraw()
+                StatsTracker.remove_player("Sub")
+                redraw()
+            add_remove_ms = _median([_timed(add_remove) for _ in range(samples)]) / 1000
+
+            rebuild = _median([_timed(redraw, True) for _ in range(samples)]) / 1000
+            print(f"{roster_size:>6} {unchanged:>13.2f} {add_remove_ms:>14.2f} {rebuild:>16.2f}")
+    finally:
+        app.destroy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the StatsTracker hot paths.")
+    parser.add_argument('--results', default="benchmark_results.json",
+                        help="file the per-operation results are saved to and compared against")
+    parser.add_argument('--ops-only', action='store_true', help="only run the per-operation suite")
+    args = parser.parse_args()
+    results_path = os.path.abspath(args.results)
+
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.chdir(temp_dir)
+        # Keep background flushes from competing with the timed calls
+        StatsTracker.set_save_interval(3600, 3600)
+        try:
+            rows = bench_operations()
+            print()
+            save_results(results_path, rows)
+            if args.ops_only:
+                return
+            print()
+            bench_score_updates()
+            print()
+            bench_read_paths()
+            print()
+            bench_input_batching()
+            print()
+            bench_history_memory()
+            print()
+            bench_storage_formats()
+            print()
+            bench_scoreboard_redraw()
+        finally:
+            StatsTracker.reset_all_stats()
+            StatsTracker.flush_data()
+            os.chdir(original_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Compact binary storage for the game state and the event log.
+
+A compact file is a 4-byte header (MAGIC) followed by length-prefixed frames:
+
+    4 bytes   payload length (little-endian)
+    1 byte    frame kind, with FLAG_ZLIB set if the payload is compressed
+    payload
+
+Stat events (player_stat / team_stat), which make up nearly all of a log,
+are STAT frames packed with struct: stat keys and periods are one-byte
+codes from STAT_KEY_CODES / PERIOD_CODES instead of repeated strings.
+Every other record (base state, roster changes, undo, ...) is a JSON frame
+holding compact JSON. Payloads of at least COMPRESS_MIN_BYTES are
+zlib-compressed when compression is on; frames stay independent, so a log
+can still be appended to one record at a time.
+
+Run with:  python CompactFormat.py SRC DST [--no-zlib]
+to convert between the JSON files and their compact forms (.jsonl <-> .bsl
+for event logs, .json <-> .bsg for stats files).
+"""
+import argparse
+import io
+import json
+import struct
+import zlib
+
+from Persistence import atomic_write
+
+MAGIC = b'BSG\x01'
+FRAME = struct.Struct('<IB')
+COMPRESS_MIN_BYTES = 128
+
+KIND_JSON = 0
+KIND_STAT = 1
+FLAG_ZLIB = 0x80
+
+# Codes are part of the file format: only ever append to these lists
+STAT_KEY_CODES = [
+    "FT_Made", "FT_Attempted", "2P_Made", "2P_Attempted", "3P_Made", "3P_Attempted",
+    "Points", "Off_Rebounds", "Def_Rebounds", "Assists", "Steals", "Blocks", "Turnovers", "Fouls",
+]
+PERIOD_CODES = ["Q1", "Q2", "Q3", "Q4"] + [f"OT{n}" for n in range(1, 10)]
+STAT_EVENT_TYPES = ['player_stat', 'team_stat']
+
+_STAT_KEY_INDEX = {key: code for code, key in enumerate(STAT_KEY_CODES)}
+_PERIOD_INDEX = {period: code for code, period in enumerate(PERIOD_CODES)}
+
+# STAT frame: event type, period, stat key, effect count, has clock, delta, clock, ts,
+# then (stat key, value) per effect and the UTF-8 player or team name
+_STAT_HEAD = struct.Struct('<BBBBBiid')
+_EFFECT = struct.Struct('<Bi')
+_STAT_FIELDS = {'type', 'period', 'ts', 'player', 'team', 'stat', 'delta', 'effects', 'clock'}
+
+# Preset dictionary for compressing JSON frames: the strings every game state repeats
+_ZDICT = json.dumps({
+    'roster': {'Team1': [{'name': "", 'team': 'Team1', 'number': 0, 'starter': True}]},
+    'player_stats': {"": {key: 0 for key in STAT_KEY_CODES}},
+    'team_score': {'Team1': 0, 'Team2': 0},
+    'team1_team_rebounds': {'Off_Rebounds': 0, 'Def_Rebounds': 0},
+    'team2_generic_stats': {key: 0 for key in STAT_KEY_CODES},
+    'current_quarter': 'Q1',
+    'quarterly_scores': {q: {'Team1': 0, 'Team2': 0, 'Cumulative1': 0, 'Cumulative2': 0} for q in PERIOD_CODES[:4]},
+    'next_ot_num': 1,
+}, separators=(',', ':')).encode()
+
+
+class FormatError(ValueError):
+    """A file that is not (or no longer) a valid compact file."""
+
+
+def _compress(payload):
+    compressor = zlib.compressobj(zdict=_ZDICT)
+    return compressor.compress(payload) + compressor.flush()
+
+
+def _decompress(payload):
+    return zlib.decompressobj(zdict=_ZDICT).decompress(payload)
+
+
+def _pack_stat(record):
+    """Packs a stat event into a STAT payload, or returns None if it needs a JSON frame."""
+    if record.get('type') not in STAT_EVENT_TYPES or not set(record) <= _STAT_FIELDS:
+        return None
+    try:
+        effects = [(_STAT_KEY_INDEX[key], value) for key, value in record['effects'].items()]
+        name = (record['player'] if record['type'] == 'player_stat' else record['team']).encode('utf-8')
+        clock = record.get('clock')
+        head = _STAT_HEAD.pack(STAT_EVENT_TYPES.index(record['type']), _PERIOD_INDEX[record['period']],
+                               _STAT_KEY_INDEX[record['stat']], len(effects), clock is not None,
+                               record['delta'], clock or 0, record['ts'])
+        return head + b''.join(_EFFECT.pack(code, value) for code, value in effects) + name
+    except (KeyError, struct.error):
+        # Keys, periods or values outside the code tables fall back to JSON
+        return None
+
+
+def _unpack_stat(payload):
+    type_code, period, stat, count, has_clock, delta, clock, ts = _STAT_HEAD.unpack_from(payload)
+    offset = _STAT_HEAD.size
+    effects = {}
+    for _ in range(count):
+        code, value = _EFFECT.unpack_from(payload, offset)
+        effects[STAT_KEY_CODES[code]] = value
+        offset += _EFFECT.size
+    event_type = STAT_EVENT_TYPES[type_code]
+    record = {'type': event_type, 'period': PERIOD_CODES[period], 'ts': ts}
+    record['player' if event_type == 'player_stat' else 'team'] = payload[offset:].decode('utf-8')
+    record.update(stat=STAT_KEY_CODES[stat], delta=delta, effects=effects)
+    if has_clock:
+        record['clock'] = clock
+    return record
+
+
+def encode_record(record, compress=True):
+    """Returns one frame holding record."""
+    payload = _pack_stat(record)
+    kind = KIND_STAT
+    if payload is None:
+        payload = json.dumps(record, separators=(',', ':')).encode('utf-8')
+        kind = KIND_JSON
+    if compress and len(payload) >= COMPRESS_MIN_BYTES:
+        compressed = _compress(payload)
+        if len(compressed) < len(payload):
+            payload = compressed
+            kind |= FLAG_ZLIB
+    return FRAME.pack(len(payload), kind) + payload
+
+
+def iter_records(f):
+    """
+    Yields the records of a compact file opened in binary mode, one frame at a
+    time. A frame whose payload cannot be decoded is skipped; a truncated one
+    (e.g. from a crash mid-append) ends the stream. Both print a message.
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise FormatError("not a compact game file")
+    while True:
+        head = f.read(FRAME.size)
+        if not head:
+            return
+        if len(head) < FRAME.size:
+            print("Skipping truncated compact record")
+            return
+        length, kind = FRAME.unpack(head)
+        payload = f.read(length)
+        if len(payload) < length:
+            print("Skipping truncated compact record")
+            return
+        try:
+            if kind & FLAG_ZLIB:
+                payload = _decompress(payload)
+            if kind & ~FLAG_ZLIB == KIND_STAT:
+                record = _unpack_stat(payload)
+            else:
+                record = json.loads(payload)
+        except (ValueError, IndexError, struct.error, zlib.error) as e:
+            print(f"Skipping corrupt compact record: {e}")
+            continue
+        yield record
+
+
+def decode_records(blob):
+    """Yields the records in a compact file's contents (see iter_records)."""
+    return iter_records(io.BytesIO(blob))
+
+
+def read_records(path):
+    with open(path, 'rb') as f:
+        return list(iter_records(f))
+
+
+def count_records(path):
+    """
+    Returns (number of complete frames, offset just past the last one) for a
+    compact file, found from the length prefixes alone.
+    """
+    count = 0
+    with open(path, 'rb') as f:
+        start = f.seek(len(MAGIC))  # File offset of buffer[0]
+        buffer = b''
+        position = 0
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            buffer = buffer[position:] + chunk
+            start += position
+            position = 0
+            while position + FRAME.size <= len(buffer):
+                length, _ = FRAME.unpack_from(buffer, position)
+                if position + FRAME.size + length > len(buffer):
+                    break
+                position += FRAME.size + length
+                count += 1
+    return count, start + position
+
+
+def dump_state(data, compress=True):
+    """The contents of a compact stats file holding data."""
+    return MAGIC + encode_record(data, compress)
+
+
+def load_state(path):
+    records = read_records(path)
+    if not records:
+        raise FormatError(f"{path} holds no game state")
+    return records[0]
+
+
+# --- CONVERSION ---
+
+def _read_jsonl(path):
+    records = []
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+def convert(src, dst, compress=True):
+    """Converts an event log (.jsonl <-> .bsl) or a stats file (.json <-> .bsg) by file extension."""
+    if src.endswith('.jsonl') and dst.endswith('.bsl'):
+        records = _read_jsonl(src)
+        atomic_write(dst, MAGIC + b''.join(encode_record(record, compress) for record in records))
+    elif src.endswith('.bsl') and dst.endswith('.jsonl'):
+        atomic_write(dst, ''.join(json.dumps(record) + "\n" for record in read_records(src)))
+    elif src.endswith('.json') and dst.endswith('.bsg'):
+        with open(src, 'r') as f:
+            atomic_write(dst, dump_state(json.load(f), compress))
+    elif src.endswith('.bsg') and dst.endswith('.json'):
+        atomic_write(dst, json.dumps(load_state(src), indent=4))
+    else:
+        raise ValueError(f"cannot convert {src} to {dst}: use .jsonl <-> .bsl or .json <-> .bsg")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert game files between JSON and the compact binary format.")
+    parser.add_argument('src')
+    parser.add_argument('dst')
+    parser.add_argument('--no-zlib', action='store_true', help="do not compress large records")
+    args = parser.parse_args()
+    try:
+        convert(args.src, args.dst, not args.no_zlib)
+    except (OSError, ValueError) as e:
+        print(f"Error converting {args.src}: {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
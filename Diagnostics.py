@@ -0,0 +1,232 @@
+"""
+Opt-in timing instrumentation for finding where a laggy game spends its time.
+
+Diagnostics.enable() wraps the main StatsTracker.GameSession operations and
+the write-behind flush in timers, and turns on timed() blocks (the GUI times
+each page refresh and input commit with them). disable() puts the original
+methods back, so nothing is measured, or slowed down, while it is off.
+
+Every timed name keeps a RollingHistogram of its most recent durations, and
+every sample also goes into a bounded trace that export_json() and
+export_csv() write out for offline analysis.
+"""
+import csv
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+import Persistence
+import StatsTracker
+
+ROLLING_SAMPLES = 1000  # Durations kept per timed name for the percentiles
+TRACE_SIZE = 20000      # Samples kept for export
+BUCKET_EDGES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+# (owner, attribute, timed name) wrapped while diagnostics are enabled
+TARGETS = [
+    (StatsTracker.GameSession, 'update_player_stat', 'update_player_stat'),
+    (StatsTracker.GameSession, 'update_team_generic_stat', 'update_team_generic_stat'),
+    (StatsTracker.GameSession, 'update_roster', 'update_roster'),
+    (StatsTracker.GameSession, 'remove_player', 'remove_player'),
+    (StatsTracker.GameSession, 'undo_last_action', 'undo_last_action'),
+    (StatsTracker.GameSession, 'redo_last_action', 'redo_last_action'),
+    (StatsTracker.GameSession, 'set_current_quarter', 'set_current_quarter'),
+    (StatsTracker.GameSession, 'end_batch', 'end_batch'),
+    (StatsTracker.GameSession, 'load_data', 'load_data'),
+    (StatsTracker.GameSession, 'get_player_data', 'get_player_data'),
+    (StatsTracker.GameSession, 'get_team_stats', 'get_team_stats'),
+    (StatsTracker.GameSession, 'get_leaderboard', 'get_leaderboard'),
+    (StatsTracker.GameSession, 'get_quarterly_score_breakdown', 'get_quarterly_score_breakdown'),
+    (StatsTracker.GameSession, '_render_stats', 'save: render JSON'),
+    (Persistence.WriteBehindWriter, 'flush', 'save: write to disk'),
+]
+
+
+class RollingHistogram:
+    """Durations (ms) of the most recent calls of one timed name, plus lifetime totals."""
+
+    def __init__(self, size=ROLLING_SAMPLES):
+        self.recent = deque(maxlen=size)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def add(self, ms):
+        self.recent.append(ms)
+        self.count += 1
+        self.total_ms += ms
+
+    def summary(self):
+        """Returns {'count', 'total_ms', 'mean', 'p50', 'p95', 'p99', 'max'} (percentiles over recent calls)."""
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {'count': 0, 'total_ms': 0.0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+        def percentile(q):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+        return {
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'mean': sum(ordered) / len(ordered),
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': ordered[-1],
+        }
+
+    def buckets(self):
+        """Recent call counts per bucket: [(upper edge in ms or None for the overflow bucket, count)]."""
+        counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+        for ms in self.recent:
+            index = 0
+            while index < len(BUCKET_EDGES_MS) and ms > BUCKET_EDGES_MS[index]:
+                index += 1
+            counts[index] += 1
+        return list(zip(BUCKET_EDGES_MS + (None,), counts))
+
+
+_lock = threading.Lock()
+_enabled = False
+_histograms = {}
+_trace = deque(maxlen=TRACE_SIZE)
+_originals = []  # (owner, attribute, original) restored by disable()
+
+
+def is_enabled():
+    return _enabled
+
+
+def record(name, start, seconds):
+    """Adds one sample: name, perf_counter() start time and duration in seconds."""
+    ms = seconds * 1000
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = RollingHistogram()
+        histogram.add(ms)
+        _trace.append((name, start, ms, threading.current_thread().name))
+
+
+class _Timer:
+    """Context manager that records the duration of its block."""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(name):
+    """`with Diagnostics.timed("name"):` times the block while diagnostics are enabled."""
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def _wrap(func, name):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, start, time.perf_counter() - start)
+    return wrapper
+
+
+def enable(targets=None):
+    """Starts timing the given (owner, attribute, name) targets (TARGETS by default) and timed() blocks."""
+    global _enabled
+    if _enabled:
+        return
+    for owner, attribute, name in (TARGETS if targets is None else targets):
+        original = owner.__dict__[attribute]
+        _originals.append((owner, attribute, original))
+        setattr(owner, attribute, _wrap(original, name))
+    _enabled = True
+
+
+def disable():
+    """Restores the original methods. Collected timings are kept until clear()."""
+    global _enabled
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        setattr(owner, attribute, original)
+    _enabled = False
+
+
+def clear():
+    with _lock:
+        _histograms.clear()
+        _trace.clear()
+
+
+def summary():
+    """Per-name timing summaries, the names taking the most total time first."""
+    with _lock:
+        rows = [{'name': name, **histogram.summary()} for name, histogram in _histograms.items()]
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+def buckets(name):
+    with _lock:
+        histogram = _histograms.get(name)
+        return histogram.buckets() if histogram else []
+
+
+# --- EXPORT ---
+
+def export_json(path):
+    """Writes the summaries, histogram buckets and the raw trace as one JSON document."""
+    with _lock:
+        trace = list(_trace)
+        names = list(_histograms)
+    document = {
+        'exported': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'summary': summary(),
+        'buckets': {name: [{'le_ms': edge, 'count': count} for edge, count in buckets(name)] for name in names},
+        'trace': [{'name': name, 'start': start, 'ms': ms, 'thread': thread} for name, start, ms, thread in trace],
+    }
+    try:
+        Persistence.atomic_write(path, json.dumps(document, indent=2))
+        return True
+    except OSError as e:
+        print(f"Error exporting diagnostics: {e}")
+        return False
+
+
+def export_csv(path):
+    """Writes the raw trace, one sample per row (start is seconds on the perf_counter clock)."""
+    with _lock:
+        trace = list(_trace)
+    try:
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['name', 'start_s', 'duration_ms', 'thread'])
+            for name, start, ms, thread in trace:
+                writer.writerow([name, f"{start:.6f}", f"{ms:.4f}", thread])
+        return True
+    except OSError as e:
+        print(f"Error exporting diagnostics: {e}")
+        return False
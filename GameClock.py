@@ -0,0 +1,153 @@
+import math
+import time
+
+# --- CONFIGURATION ---
+QUARTER_LENGTH_S = 8 * 60   # High school quarters
+OVERTIME_LENGTH_S = 4 * 60
+SHOT_CLOCK_S = 35
+TENTHS_BELOW_S = 60         # Game clock shows tenths of a second in the last minute
+
+
+class Countdown:
+    """
+    A countdown kept as a time.monotonic() deadline while running and as the
+    remaining time while paused. Remaining time is always computed from the
+    clock, never decremented per tick, so late or skipped UI callbacks cannot
+    make it drift.
+    """
+
+    def __init__(self, duration_s, clock=time.monotonic):
+        self.duration_s = duration_s
+        self._clock = clock
+        self._remaining_s = float(duration_s)
+        self._deadline = None
+
+    @property
+    def running(self):
+        return self._deadline is not None
+
+    def remaining(self):
+        """Seconds left (never negative). Reaching zero stops the countdown."""
+        if self._deadline is None:
+            return self._remaining_s
+        remaining = self._deadline - self._clock()
+        if remaining <= 0:
+            self._remaining_s = 0.0
+            self._deadline = None
+            return 0.0
+        return remaining
+
+    def tenths(self):
+        """Remaining time in whole tenths of a second, rounded up so 0 means expired."""
+        return math.ceil(round(self.remaining() * 10, 6))
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def start(self):
+        if self._deadline is None and self._remaining_s > 0:
+            self._deadline = self._clock() + self._remaining_s
+
+    def pause(self):
+        if self._deadline is not None:
+            self._remaining_s = self.remaining()
+            self._deadline = None
+
+    def set_remaining(self, seconds):
+        """Sets the time left, keeping the running/paused state."""
+        running = self.running
+        self._remaining_s = max(0.0, float(seconds))
+        self._deadline = None
+        if running:
+            self.start()
+
+    def reset(self, duration_s=None):
+        """Pauses and refills the countdown (optionally with a new duration)."""
+        if duration_s is not None:
+            self.duration_s = duration_s
+        self._deadline = None
+        self._remaining_s = float(self.duration_s)
+
+    def seconds_until_change(self, resolution_s):
+        """Time until the displayed value (at resolution_s steps) next changes, or None if paused."""
+        remaining = self.remaining()
+        if not self.running:
+            return None
+        step = remaining % resolution_s
+        return step if step > 1e-6 else resolution_s
+
+
+class GameClock:
+    """
+    The game clock and shot clock. Starting or stopping the game clock also
+    starts or stops the shot clock; the shot clock can be reset on its own.
+    """
+
+    def __init__(self, period_length_s=QUARTER_LENGTH_S, shot_clock_s=SHOT_CLOCK_S, clock=time.monotonic):
+        self.game = Countdown(period_length_s, clock)
+        self.shot = Countdown(shot_clock_s, clock)
+
+    @property
+    def running(self):
+        self._sync()
+        return self.game.running
+
+    def _sync(self):
+        """The shot clock stops when the game clock runs out."""
+        if self.game.expired() and self.shot.running:
+            self.shot.pause()
+
+    def start(self):
+        if self.game.expired():
+            return
+        self.game.start()
+        if self.shot.expired():
+            self.shot.reset()
+        self.shot.start()
+
+    def pause(self):
+        self.game.pause()
+        self.shot.pause()
+
+    def toggle(self):
+        """Starts a stopped clock or stops a running one. Returns whether it is now running."""
+        if self.running:
+            self.pause()
+        else:
+            self.start()
+        return self.running
+
+    def reset_shot_clock(self, seconds=None):
+        """Refills the shot clock (e.g. on a change of possession), keeping it running if the game clock is."""
+        self.shot.reset(seconds if seconds is not None else self.shot.duration_s)
+        if self.game.running:
+            self.shot.start()
+
+    def start_period(self, quarter_label):
+        """Stops both clocks and sets the game clock to a full period (quarter or overtime)."""
+        length = OVERTIME_LENGTH_S if quarter_label.startswith('OT') else QUARTER_LENGTH_S
+        self.game.reset(length)
+        self.shot.reset()
+
+    def game_clock_tenths(self):
+        """Game time left in the period, in tenths of a second (the value stamped on events)."""
+        return self.game.tenths()
+
+    def next_display_change(self):
+        """Seconds until either clock's display changes, or None when both are stopped."""
+        self._sync()
+        game_resolution = 0.1 if self.game.remaining() <= TENTHS_BELOW_S else 1.0
+        delays = [d for d in (self.game.seconds_until_change(game_resolution), self.shot.seconds_until_change(1.0)) if d is not None]
+        return min(delays) if delays else None
+
+
+def format_game_clock(tenths):
+    """M:SS, or SS.t in the last minute."""
+    if tenths < TENTHS_BELOW_S * 10:
+        return f"{tenths // 10}.{tenths % 10}"
+    seconds = math.ceil(tenths / 10)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def format_shot_clock(tenths):
+    return str(math.ceil(tenths / 10))
@@ -0,0 +1,324 @@
+"""
+Headless server hosting many live games in one process.
+
+Run with:  python GameServer.py [--host 127.0.0.1] [--port 8765] [--root games]
+
+Each game is a StatsTracker.GameSession stored in its own directory under
+--root. Clients talk JSON over plain HTTP/1.1 (keep-alive supported):
+
+    GET  /games                     list game ids
+    POST /games                     create a game; body {"id": "..."} is optional
+    GET  /games/<id>/score          score and current quarter
+    GET  /games/<id>/boxscore       players, team stats and per-period scores;
+                                    ?periods=H2 or ?periods=Q4,OT limits the stats to those periods
+    GET  /games/<id>/analytics      advanced metrics (see Analytics), cached until the game changes
+    POST /games/<id>/events         one event object or a list of them
+    GET  /games/<id>/feed           live deltas (see LiveFeed); ?since=<seq> returns
+                                    what followed seq, &wait=<s> long-polls for it
+
+Event objects use the same names as the StatsTracker functions:
+
+    {"type": "player_stat", "player": "Player A", "stat": "2P_Made", "value": 1}
+    {"type": "team_stat", "team": "Team2", "stat": "3P_Made", "value": 1}
+    {"type": "roster", "name": "Player C", "team": "Team1", "number": 12, "starter": false}
+    {"type": "remove_player", "name": "Player C"}
+    {"type": "quarter", "quarter": "Q2"}
+    {"type": "undo"}
+    {"type": "redo"}
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+from urllib.parse import parse_qs
+
+import Analytics
+import LiveFeed
+import StatsTracker
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_ROOT = "games"
+MAX_BODY_BYTES = 1 << 20
+MAX_FEED_WAIT_S = 30.0
+
+GAME_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+QUARTER_PATTERN = re.compile(r"Q[1-4]|OT[1-9][0-9]*")  # Period labels, matched whole
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large"}
+
+
+class RequestError(Exception):
+    """An error reported back to the client with an HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- GAME REGISTRY ---
+
+class GameServer:
+    """Owns the game sessions and maps API requests onto them."""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        self.sessions = {}
+        self.feeds = {}
+        self._feed_signals = {}
+        self.analytics = {}
+        os.makedirs(root, exist_ok=True)
+        # Games saved by an earlier run are picked up again (and load lazily)
+        for name in sorted(os.listdir(root)):
+            if GAME_ID_PATTERN.match(name) and os.path.isdir(os.path.join(root, name)):
+                self.sessions[name] = StatsTracker.GameSession(os.path.join(root, name))
+        self._next_id = len(self.sessions) + 1
+
+    def create_game(self, game_id=None):
+        if game_id is None:
+            while f"game{self._next_id}" in self.sessions:
+                self._next_id += 1
+            game_id = f"game{self._next_id}"
+        if not isinstance(game_id, str) or not GAME_ID_PATTERN.match(game_id):
+            raise RequestError(400, "game id must be 1-64 letters, digits, '-' or '_'")
+        if game_id in self.sessions:
+            raise RequestError(409, f"game {game_id} already exists")
+
+        directory = os.path.join(self.root, game_id)
+        os.makedirs(directory, exist_ok=True)
+        session = StatsTracker.GameSession(directory)
+        session.reset_all_stats()
+        self.sessions[game_id] = session
+        return game_id
+
+    def get_session(self, game_id):
+        session = self.sessions.get(game_id)
+        if session is None:
+            raise RequestError(404, f"no game {game_id}")
+        return session
+
+    def get_feed(self, game_id):
+        """Returns the game's LiveFeed, starting it on first use."""
+        if game_id not in self.feeds:
+            feed = LiveFeed.LiveFeed(self.get_session(game_id))
+            self._feed_signals[game_id] = asyncio.Event()
+            # Sessions are only mutated on the event loop, so waking waiters directly is safe
+            feed.subscribe(lambda message: self._feed_signals[game_id].set())
+            self.feeds[game_id] = feed
+        return self.feeds[game_id]
+
+    def get_analytics(self, game_id):
+        """Returns the game's advanced metrics, computed again only after it changed."""
+        if game_id not in self.analytics:
+            self.analytics[game_id] = Analytics.SessionMetrics(self.get_session(game_id))
+        return self.analytics[game_id].get()
+
+    async def read_feed(self, game_id, query):
+        """Returns a snapshot, or the messages after ?since=, waiting up to ?wait= seconds for new ones."""
+        feed = self.get_feed(game_id)
+        params = parse_qs(query)
+        try:
+            since = int(params['since'][0]) if 'since' in params else None
+            wait = min(float(params.get('wait', ['0'])[0]), MAX_FEED_WAIT_S)
+        except ValueError as e:
+            raise RequestError(400, f"bad feed query: {e}")
+
+        if since is None:
+            return {'seq': feed.seq, 'messages': [feed.snapshot()]}
+
+        if since == feed.seq and wait > 0:
+            signal = self._feed_signals[game_id]
+            signal.clear()
+            try:
+                await asyncio.wait_for(signal.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+        return {'seq': feed.seq, 'messages': feed.since(since)}
+
+    def apply_event(self, session, event):
+        """Applies one API event object to a session."""
+        if not isinstance(event, dict):
+            raise RequestError(400, "events must be JSON objects")
+        try:
+            event_type = event['type']
+            if event_type == 'player_stat':
+                session.update_player_stat(event['player'], _stat_key(event['stat']), int(event.get('value', 1)))
+            elif event_type == 'team_stat':
+                if event['team'] not in ('Team1', 'Team2'):
+                    raise RequestError(400, f"unknown team {event['team']!r}")
+                session.update_team_generic_stat(event['team'], _stat_key(event['stat']), int(event.get('value', 1)))
+            elif event_type == 'roster':
+                session.update_roster(event['name'], event.get('team', 'Team1'), int(event['number']), bool(event.get('starter', False)))
+            elif event_type == 'remove_player':
+                session.remove_player(event['name'])
+            elif event_type == 'quarter':
+                if not QUARTER_PATTERN.fullmatch(event['quarter']):
+                    raise RequestError(400, f"unknown quarter {event['quarter']!r}")
+                session.set_current_quarter(event['quarter'])
+            elif event_type == 'undo':
+                session.undo_last_action()
+            elif event_type == 'redo':
+                session.redo_last_action()
+            else:
+                raise RequestError(400, f"unknown event type {event_type!r}")
+        except (KeyError, TypeError, ValueError) as e:
+            raise RequestError(400, f"bad {event.get('type', 'event')} event: {e}")
+
+    def score(self, session):
+        return {'score': session.get_current_score(), 'quarter': session.get_current_quarter()}
+
+    def box_score(self, session, query=''):
+        periods = parse_qs(query).get('periods')
+        if periods:
+            periods = [period for value in periods for period in value.split(',') if period]
+        return {
+            'score': session.get_current_score(),
+            'quarter': session.get_current_quarter(),
+            'periods': periods,
+            'players': session.get_player_data(periods),
+            'team_stats': {'Team1': session.get_team_stats('Team1', periods), 'Team2': session.get_team_stats('Team2', periods)},
+            'quarters': session.get_quarterly_score_breakdown(),
+        }
+
+    async def handle(self, method, path, body):
+        """Routes one request. Returns (status, payload)."""
+        path, _, query = path.partition('?')
+        parts = [p for p in path.split('/') if p]
+
+        if parts == ['games']:
+            if method == 'GET':
+                return 200, {'games': sorted(self.sessions)}
+            if method == 'POST':
+                return 201, {'id': self.create_game(body.get('id') if isinstance(body, dict) else None)}
+            raise RequestError(405, f"{method} not allowed on /games")
+
+        if len(parts) == 3 and parts[0] == 'games':
+            session = self.get_session(parts[1])
+            if parts[2] == 'events' and method == 'POST':
+                events = body if isinstance(body, list) else [body]
+                for event in events:
+                    self.apply_event(session, event)
+                return 200, {'applied': len(events), **self.score(session)}
+            if parts[2] == 'score' and method == 'GET':
+                return 200, self.score(session)
+            if parts[2] == 'boxscore' and method == 'GET':
+                return 200, self.box_score(session, query)
+            if parts[2] == 'feed' and method == 'GET':
+                return 200, await self.read_feed(parts[1], query)
+            if parts[2] == 'analytics' and method == 'GET':
+                return 200, self.get_analytics(parts[1])
+            if parts[2] in ('events', 'score', 'boxscore', 'feed', 'analytics'):
+                raise RequestError(405, f"{method} not allowed on {path}")
+
+        raise RequestError(404, f"no route for {path}")
+
+    def flush(self):
+        StatsTracker.flush_data()
+
+
+def _stat_key(stat_key):
+    if stat_key not in StatsTracker.STAT_KEYS_T1 and stat_key not in StatsTracker.TEAM_STAT_KEYS:
+        raise RequestError(400, f"unknown stat {stat_key!r}")
+    return stat_key
+
+
+# --- HTTP ---
+
+async def _read_request(reader):
+    """Reads one HTTP request. Returns (method, path, headers, body bytes) or None at EOF."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    except ValueError:
+        raise RequestError(400, "malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        raise RequestError(400, "invalid Content-Length")
+    if length < 0:
+        raise RequestError(400, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise RequestError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path, headers, body
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+async def _serve_client(server, reader, writer):
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, raw_body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    body = json.loads(raw_body) if raw_body else None
+                except json.JSONDecodeError as e:
+                    raise RequestError(400, f"invalid JSON: {e}")
+                status, payload = await server.handle(method, path, body)
+            except RequestError as e:
+                status, payload = e.status, {'error': str(e)}
+
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(server, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Starts listening for API requests. Returns the asyncio.Server."""
+    return await asyncio.start_server(lambda r, w: _serve_client(server, r, w), host, port)
+
+
+async def _main(args):
+    server = GameServer(args.root)
+    listener = await start_server(server, args.host, args.port)
+    print(f"Serving {len(server.sessions)} game(s) from {args.root} on http://{args.host}:{args.port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many live basketball games over a local HTTP API.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--root', default=DEFAULT_ROOT, help="directory holding one sub-directory per game")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
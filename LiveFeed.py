@@ -0,0 +1,181 @@
+"""
+Delta-based live feed of a game for external scoreboards.
+
+A LiveFeed listens to a StatsTracker.GameSession and turns every change into
+small numbered messages ("deltas") instead of the whole game state:
+
+    {'seq': 42, 'kind': 'player_stat', 'player': 'Player A', 'stats': {'2P_Made': 3, '2P_Attempted': 5, 'Points': 6}}
+    {'seq': 43, 'kind': 'score', 'score': {'Team1': 30, 'Team2': 28}}
+
+Values in a delta are the new absolute values, so applying one is a plain
+dictionary update. A subscriber starts from snapshot() and then applies
+deltas in seq order; after a gap it asks since(last_seq), which replays the
+missed deltas from a ring buffer or, if they are too old, returns a fresh
+snapshot. FeedMirror implements the subscriber side.
+"""
+import copy
+import threading
+from collections import deque
+
+import StatsTracker
+
+HISTORY_SIZE = 1024  # Deltas kept for catching up after a gap
+
+
+def _state_from_data(data):
+    """The subscriber-facing view of game_data."""
+    return {
+        'score': dict(data['team_score']),
+        'quarter': data.get('current_quarter', 'Q1'),
+        'roster': copy.deepcopy(data['roster'].get('Team1', [])),
+        'player_stats': copy.deepcopy(data['player_stats']),
+        'team_stats': {'Team1': dict(data['team1_team_rebounds']), 'Team2': dict(data['team2_generic_stats'])},
+        'quarterly_scores': copy.deepcopy(data['quarterly_scores']),
+        'next_ot_num': data['next_ot_num'],
+    }
+
+
+def _deltas_for_event(data, event):
+    """Builds the deltas describing the state change an applied or undone event caused."""
+    event_type = event['type']
+    deltas = []
+
+    if event_type == 'player_stat':
+        stats = data['player_stats'].get(event['player'], {})
+        deltas.append({'kind': 'player_stat', 'player': event['player'],
+                       'stats': {key: stats.get(key, 0) for key in event['effects']}})
+    elif event_type == 'team_stat':
+        stats = data['team1_team_rebounds'] if event['team'] == 'Team1' else data['team2_generic_stats']
+        deltas.append({'kind': 'team_stat', 'team': event['team'],
+                       'stats': {key: stats.get(key, 0) for key in event['effects']}})
+    elif event_type in ('roster', 'remove_player'):
+        name = event['name']
+        deltas.append({'kind': 'roster', 'roster': copy.deepcopy(data['roster'].get('Team1', [])),
+                       'player': name, 'stats': copy.deepcopy(data['player_stats'].get(name))})
+    elif event_type == 'quarter':
+        deltas.append({'kind': 'period', 'quarter': data['current_quarter']})
+
+    scored = event_type in ('player_stat', 'team_stat') and event['effects'].get('Points')
+    if scored or event_type in ('roster', 'remove_player'):
+        deltas.append({'kind': 'score', 'score': dict(data['team_score'])})
+    if scored or event_type in ('roster', 'remove_player', 'quarter'):
+        # A few rows at most; points in one period also move the cumulative scores after it
+        deltas.append({'kind': 'quarterly_scores', 'quarterly_scores': copy.deepcopy(data['quarterly_scores']),
+                       'next_ot_num': data['next_ot_num']})
+    return deltas
+
+
+class LiveFeed:
+    """Publishes numbered deltas for one game session."""
+
+    def __init__(self, session, history_size=HISTORY_SIZE):
+        self.session = session
+        self.seq = 0
+        self._lock = threading.RLock()
+        self._recent = deque(maxlen=history_size)
+        self._subscribers = []
+        session.add_listener(self._on_change)
+
+    def close(self):
+        self.session.remove_listener(self._on_change)
+
+    def _on_change(self, session, event, sign):
+        if event is StatsTracker.RESET_EVENT:
+            # Earlier deltas no longer apply on top of the new state
+            self._publish({'kind': 'snapshot', 'state': _state_from_data(session.data)}, reset=True)
+            return
+        for delta in _deltas_for_event(session.data, event):
+            self._publish(delta)
+
+    def _publish(self, delta, reset=False):
+        with self._lock:
+            self.seq += 1
+            message = {'seq': self.seq, **delta}
+            if reset:
+                self._recent.clear()
+            self._recent.append(message)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(message)
+            except Exception as e:
+                print(f"Error delivering feed message: {e}")
+
+    def snapshot(self):
+        """Returns {'seq', 'kind': 'snapshot', 'state'} for the current game state."""
+        with self.session.lock, self._lock:
+            return {'seq': self.seq, 'kind': 'snapshot', 'state': _state_from_data(self.session.data)}
+
+    def since(self, seq):
+        """
+        Returns the messages published after seq. If some of them have already
+        left the ring buffer (or seq is unknown), returns [snapshot()] instead.
+        """
+        with self.session.lock, self._lock:
+            if seq == self.seq:
+                return []
+            if 0 <= seq < self.seq and self._recent and self._recent[0]['seq'] <= seq + 1:
+                return [message for message in self._recent if message['seq'] > seq]
+            return [self.snapshot()]
+
+    def subscribe(self, callback):
+        """Registers callback(message) for every new delta. Returns the snapshot to start from."""
+        with self.session.lock, self._lock:
+            self._subscribers.append(callback)
+            return self.snapshot()
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+
+class FeedMirror:
+    """
+    Subscriber-side copy of a game built only from feed messages.
+    apply() returns False when a message does not follow the last one, in
+    which case the caller fetches since(mirror.seq) and applies that.
+    """
+
+    def __init__(self):
+        self.seq = None
+        self.state = None
+
+    def apply(self, message):
+        kind = message['kind']
+        if kind == 'snapshot':
+            self.state = copy.deepcopy(message['state'])
+            self.seq = message['seq']
+            return True
+        if self.seq is None or message['seq'] <= self.seq:
+            return self.seq is not None  # Already applied
+        if message['seq'] != self.seq + 1:
+            return False
+
+        state = self.state
+        if kind == 'player_stat':
+            if message['player'] not in state['player_stats']:
+                # Same as the tracker: a player's first stat creates their full stat line
+                state['player_stats'][message['player']] = {k: 0 for k in StatsTracker.STAT_KEYS_T1}
+            state['player_stats'][message['player']].update(message['stats'])
+        elif kind == 'team_stat':
+            state['team_stats'][message['team']].update(message['stats'])
+        elif kind == 'roster':
+            state['roster'] = copy.deepcopy(message['roster'])
+            if message['stats'] is None:
+                state['player_stats'].pop(message['player'], None)
+            else:
+                state['player_stats'][message['player']] = copy.deepcopy(message['stats'])
+        elif kind == 'score':
+            state['score'] = dict(message['score'])
+        elif kind == 'period':
+            state['quarter'] = message['quarter']
+        elif kind == 'quarterly_scores':
+            state['quarterly_scores'] = copy.deepcopy(message['quarterly_scores'])
+            state['next_ot_num'] = message['next_ot_num']
+        self.seq = message['seq']
+        return True
+
+    def apply_all(self, messages):
+        """Applies messages in order; returns False at the first gap."""
+        return all(self.apply(message) for message in messages)
@@ -0,0 +1,148 @@
+"""
+Load test for GameServer: drives many simulated games at once.
+
+Run with:  python LoadTest.py [--games 200] [--events 100]
+By default a server is started in-process on a free localhost port with its
+games in a temporary directory. Pass --port to target a server that is
+already running instead.
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+import GameServer
+import StatsTracker
+
+SHOT_POINTS = {'FT_Made': 1, '2P_Made': 2, '3P_Made': 3}
+OTHER_STATS = ['Assists', 'Steals', 'Blocks', 'Turnovers', 'Fouls', 'Off_Rebounds', 'Def_Rebounds', 'FT_Attempted', '2P_Attempted']
+
+
+class Client:
+    """Minimal keep-alive HTTP/1.1 JSON client."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.writer.write(
+            (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+             f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def _play_game(host, port, events, seed, latencies):
+    """Creates a game, logs random events and checks the server's final score. Returns True if it matched."""
+    rng = random.Random(seed)
+    client = Client(host, port)
+    await client.connect()
+    try:
+        _, created = await client.request('POST', '/games')
+        path = f"/games/{created['id']}"
+        players = [f"Player {i}" for i in range(8)]
+        for i, name in enumerate(players):
+            await client.request('POST', path + '/events', {'type': 'roster', 'name': name, 'team': 'Team1', 'number': i, 'starter': i < 5})
+
+        expected = {'Team1': 0, 'Team2': 0}
+        for _ in range(events):
+            if rng.random() < 0.7:
+                stat = rng.choice(list(SHOT_POINTS) + OTHER_STATS)
+                event = {'type': 'player_stat', 'player': rng.choice(players), 'stat': stat, 'value': 1}
+                expected['Team1'] += SHOT_POINTS.get(stat, 0)
+            else:
+                stat = rng.choice(list(SHOT_POINTS))
+                event = {'type': 'team_stat', 'team': 'Team2', 'stat': stat, 'value': 1}
+                expected['Team2'] += SHOT_POINTS[stat]
+
+            start = time.perf_counter()
+            status, _ = await client.request('POST', path + '/events', event)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                return False
+
+        _, box = await client.request('GET', path + '/boxscore')
+        return box['score'] == expected
+    finally:
+        await client.close()
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_load_test(host, port, games, events, concurrency):
+    latencies = []
+    limit = asyncio.Semaphore(concurrency)
+
+    async def play(seed):
+        async with limit:
+            return await _play_game(host, port, events, seed, latencies)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(play(seed) for seed in range(games)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{games} games x {events} events in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:,.0f} events/s, up to {concurrency} games at once)")
+    print(f"latency ms: p50 {_percentile(latencies, 0.5) * 1e3:.2f}  "
+          f"p95 {_percentile(latencies, 0.95) * 1e3:.2f}  p99 {_percentile(latencies, 0.99) * 1e3:.2f}")
+    mismatched = results.count(False)
+    print("all final scores match" if not mismatched else f"{mismatched} game(s) ended with the wrong score")
+    return mismatched == 0
+
+
+async def _main(args):
+    if args.port is not None:
+        return await run_load_test(args.host, args.port, args.games, args.events, args.concurrency)
+
+    with tempfile.TemporaryDirectory() as root:
+        server = GameServer.GameServer(root)
+        listener = await GameServer.start_server(server, args.host, 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await run_load_test(args.host, port, args.games, args.events, args.concurrency)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            server.flush()
+            print(f"{StatsTracker._writer.bytes_written:,} bytes written to disk")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive many simulated games against GameServer.")
+    parser.add_argument('--host', default=GameServer.DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=None, help="target a running server instead of starting one")
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--events', type=int, default=100, help="stat events per game")
+    parser.add_argument('--concurrency', type=int, default=200, help="games played at the same time")
+    args = parser.parse_args()
+    raise SystemExit(0 if asyncio.run(_main(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
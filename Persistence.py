@@ -0,0 +1,164 @@
+import os
+import tempfile
+import threading
+import time
+
+# Read once: the process umask can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write(path, text):
+    """Writes text (str or bytes) to path via a temp file and rename, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp_", suffix=os.path.basename(path), dir=directory)
+    try:
+        # mkstemp creates the file owner-only; keep the mode the file had (or would get from open())
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(temp_path, mode)
+        with os.fdopen(fd, 'wb' if isinstance(text, bytes) else 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class WriteBehindWriter:
+    """
+    Coalesces file writes and performs them on a background thread.
+
+    Callers mark a file dirty with a render function (full rewrite), queue
+    lines to append, queue a removal, or schedule a keyed task (for stores
+    that do their own writing, such as SQLite). The worker flushes once the oldest
+    pending change is interval_s old or nothing new has arrived for idle_s,
+    whichever comes first. Render functions run on the writer thread, so they
+    must take whatever lock guards the data they serialize.
+    """
+
+    def __init__(self, interval_s=1.0, idle_s=0.25):
+        self.interval_s = interval_s
+        self.idle_s = idle_s
+        self.bytes_written = 0
+
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._tasks = {}
+        self._first_mark = 0.0
+        self._last_mark = 0.0
+        self._thread = None
+        self._stopping = False
+
+    def _mark(self):
+        """Records the time of a new change and starts the worker (caller holds _cond)."""
+        now = time.monotonic()
+        if not self._pending and not self._tasks:
+            self._first_mark = now
+        self._last_mark = now
+
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, name="WriteBehindWriter", daemon=True)
+            self._thread.start()
+
+    def _entry(self, path):
+        """Returns the pending-operations entry for path (caller holds _cond)."""
+        self._mark()
+        # Resolve now: the worker may flush after the working directory changed
+        path = os.path.abspath(path)
+        if path not in self._pending:
+            self._pending[path] = {'remove': False, 'appends': [], 'render': None}
+        return self._pending[path]
+
+    def schedule(self, key, task):
+        """Schedules task() to run on the next flush; repeated keys coalesce into one call."""
+        with self._cond:
+            self._mark()
+            self._tasks[key] = task
+            self._cond.notify()
+
+    def mark_dirty(self, path, render):
+        """Schedules path to be rewritten atomically with the output of render()."""
+        with self._cond:
+            self._entry(path)['render'] = render
+            self._cond.notify()
+
+    def append(self, path, text):
+        """Schedules text to be appended to path (str for text files, bytes for binary ones)."""
+        with self._cond:
+            self._entry(path)['appends'].append(text)
+            self._cond.notify()
+
+    def remove(self, path):
+        """Schedules path for deletion, discarding writes queued before it."""
+        with self._cond:
+            entry = self._entry(path)
+            entry['remove'] = True
+            entry['appends'] = []
+            entry['render'] = None
+            self._cond.notify()
+
+    def flush(self):
+        """Synchronously writes everything that is pending."""
+        with self._flush_lock:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+                tasks, self._tasks = self._tasks, {}
+
+            for path, entry in pending.items():
+                try:
+                    if entry['remove'] and os.path.exists(path):
+                        os.remove(path)
+                    if entry['appends']:
+                        appends = entry['appends']
+                        text = b"".join(appends) if isinstance(appends[0], bytes) else "".join(appends)
+                        with open(path, 'ab' if isinstance(text, bytes) else 'a') as f:
+                            f.write(text)
+                            f.flush()
+                            os.fsync(f.fileno())
+                        self.bytes_written += len(text)
+                    if entry['render'] is not None:
+                        text = entry['render']()
+                        atomic_write(path, text)
+                        self.bytes_written += len(text)
+                except Exception as e:
+                    print(f"Error saving {path}: {e}")
+
+            for key, task in tasks.items():
+                try:
+                    task()
+                except Exception as e:
+                    print(f"Error running write task {key}: {e}")
+
+    def close(self):
+        """Flushes pending writes and stops the worker thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._tasks and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+
+                # Wait out the cadence so bursts of updates coalesce into one write.
+                while (self._pending or self._tasks) and not self._stopping:
+                    due = min(self._first_mark + self.interval_s, self._last_mark + self.idle_s)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+            self.flush()
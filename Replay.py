@@ -0,0 +1,138 @@
+"""
+Headless bulk replay: recomputes box scores for saved games without the GUI.
+
+Run with:  python Replay.py PATH [PATH ...] [--out box_scores] [--workers N]
+
+A PATH can be an event log (.jsonl or compact .bsl), a saved stats file
+(.json or compact .bsg), a game directory holding either, or a folder of
+game directories (such as the GameServer --root), which is searched
+recursively. Each game is replayed
+through StatsTracker, its scores are recalculated from the recorded makes
+with the current SCORING_MAP, and its box score is written to
+<out>/<game>.json. Games are spread across a process pool. Archived files
+are only read, never rewritten.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import Persistence
+import StatsTracker
+
+DEFAULT_OUT = "box_scores"
+
+
+def find_games(paths):
+    """Returns [(game id, path to its log or stats file)] for the given files and directories."""
+    games = []
+    for path in paths:
+        if os.path.isfile(path):
+            games.append((os.path.splitext(os.path.basename(path))[0], path))
+            continue
+        if not os.path.isdir(path):
+            print(f"Error finding games: {path} does not exist")
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories.sort()
+            # The event log is the source of truth when a game has both files
+            for name in (StatsTracker.HISTORY_FILE, StatsTracker.COMPACT_HISTORY_FILE,
+                         StatsTracker.STATS_FILE, StatsTracker.COMPACT_STATS_FILE):
+                if name in files:
+                    relative = os.path.relpath(directory, path)
+                    game_id = os.path.basename(os.path.abspath(path)) if relative == '.' else relative.replace(os.sep, '_')
+                    games.append((game_id, os.path.join(directory, name)))
+                    break
+
+    # Two inputs with the same name would otherwise overwrite each other's box score
+    seen = {}
+    unique = []
+    for game_id, path in games:
+        seen[game_id] = seen.get(game_id, 0) + 1
+        unique.append((game_id if seen[game_id] == 1 else f"{game_id}_{seen[game_id]}", path))
+    return unique
+
+
+def load_game(path):
+    """Returns (game data with the scores as recorded, events) from an event log or a saved stats file."""
+    if path.endswith(('.jsonl', '.bsl')):
+        data, events, _ = StatsTracker._replay_log(path)
+        StatsTracker._refresh_scores(data)
+        return data, events
+    data, _ = StatsTracker._read_stats_file(path)
+    missing = [key for key in StatsTracker.REQUIRED_KEYS if key not in data]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    return data, []
+
+
+def box_score(session):
+    """The recomputed box score (same shape as GameServer's /boxscore)."""
+    return {
+        'score': session.get_current_score(),
+        'quarter': session.get_current_quarter(),
+        'players': session.get_player_data(),
+        'team_stats': {'Team1': session.get_team_stats('Team1'), 'Team2': session.get_team_stats('Team2')},
+        'quarters': session.get_quarterly_score_breakdown(),
+    }
+
+
+def replay_game(game_id, path, out_dir):
+    """Recomputes one game and writes its box score. Runs in a worker process."""
+    try:
+        data, events = load_game(path)
+        recorded_score = dict(data['team_score'])
+        session = StatsTracker.GameSession.from_data(data, events)
+        result = box_score(session)
+        result['game'] = game_id
+        result['source'] = path
+        result['events'] = len(events)
+        Persistence.atomic_write(os.path.join(out_dir, f"{game_id}.json"), json.dumps(result, indent=4))
+        return {'game': game_id, 'events': len(events), 'score': result['score'], 'recorded_score': recorded_score}
+    except Exception as e:
+        return {'game': game_id, 'error': f"{type(e).__name__}: {e}"}
+
+
+def replay_all(games, out_dir, workers=None):
+    """Replays every game, in a process pool unless workers is 1. Returns the per-game results in order."""
+    os.makedirs(out_dir, exist_ok=True)
+    if workers == 1 or len(games) < 2:
+        return [replay_game(game_id, path, out_dir) for game_id, path in games]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Batches keep the per-task overhead small next to a short game replay
+        chunksize = max(1, len(games) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(replay_game, *zip(*games), [out_dir] * len(games), chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute box scores for saved games without the GUI.")
+    parser.add_argument('paths', nargs='+', help="event logs, stats files, game directories or folders of games")
+    parser.add_argument('--out', default=DEFAULT_OUT, help="directory the box scores are written to")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    games = find_games(args.paths)
+    if not games:
+        print("No games found.")
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    results = replay_all(games, args.out, args.workers)
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if 'error' in r]
+    changed = [r for r in results if 'error' not in r and r['score'] != r['recorded_score']]
+    for result in failed:
+        print(f"Error replaying {result['game']}: {result['error']}")
+    for result in changed:
+        print(f"{result['game']}: score {result['recorded_score']} -> {result['score']}")
+
+    events = sum(r.get('events', 0) for r in results)
+    print(f"{len(results) - len(failed)} of {len(results)} games recomputed ({events:,} events) "
+          f"in {elapsed:.2f}s; {len(changed)} score(s) changed. Box scores in {args.out}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
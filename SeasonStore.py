@@ -0,0 +1,207 @@
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    label TEXT,
+    started_at REAL,
+    ended_at REAL,
+    team1_score INTEGER NOT NULL DEFAULT 0,
+    team2_score INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS game_players (
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    number INTEGER,
+    starter INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (game_id, player_id)
+);
+-- One row per stat change. Undo writes the inverse row, so SUM(delta) is always the current total.
+CREATE TABLE IF NOT EXISTS stat_events (
+    id INTEGER PRIMARY KEY,
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    team TEXT NOT NULL,
+    player_id INTEGER REFERENCES players(id),
+    period TEXT NOT NULL,
+    stat TEXT NOT NULL,
+    delta INTEGER NOT NULL,
+    ts REAL
+);
+CREATE INDEX IF NOT EXISTS idx_stat_events_game ON stat_events (game_id, team, stat);
+CREATE INDEX IF NOT EXISTS idx_stat_events_player ON stat_events (player_id, stat);
+CREATE INDEX IF NOT EXISTS idx_stat_events_period ON stat_events (game_id, period);
+CREATE INDEX IF NOT EXISTS idx_stat_events_stat ON stat_events (stat);
+"""
+
+
+class SeasonStore:
+    """
+    SQLite database holding every game of a season: games, players and the
+    stat changes recorded in each. Box scores and career totals are SQL
+    aggregations over stat_events, so no game has to be loaded into memory.
+
+    Writes are buffered with record()/set_roster_entry() and committed in one
+    transaction by flush(), which StatsTracker runs on its write-behind thread.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._buffer = []
+        self._player_ids = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    # --- WRITES ---
+
+    def _player_id(self, name):
+        """Returns the id for a player name, creating the row if needed (caller holds _lock)."""
+        if name not in self._player_ids:
+            self._conn.execute("INSERT OR IGNORE INTO players (name) VALUES (?)", (name,))
+            row = self._conn.execute("SELECT id FROM players WHERE name = ?", (name,)).fetchone()
+            self._player_ids[name] = row[0]
+        return self._player_ids[name]
+
+    def start_game(self, label=None, started_at=None):
+        """Creates a game row and returns its id."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO games (label, started_at) VALUES (?, ?)",
+                (label, started_at if started_at is not None else time.time()))
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def end_game(self, game_id, team1_score, team2_score, ended_at=None):
+        """Stores the final score and end time of a game."""
+        with self._lock:
+            self.flush()
+            self._conn.execute(
+                "UPDATE games SET ended_at = ?, team1_score = ?, team2_score = ? WHERE id = ?",
+                (ended_at if ended_at is not None else time.time(), team1_score, team2_score, game_id))
+            self._conn.commit()
+
+    def has_game(self, game_id):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM games WHERE id = ?", (game_id,)).fetchone() is not None
+
+    def record(self, game_id, team, player_name, period, effects, ts=None, sign=1):
+        """Buffers one stat_events row per effect in a {stat: delta} mapping."""
+        with self._lock:
+            for stat, delta in effects.items():
+                if delta:
+                    self._buffer.append(('stat', game_id, team, player_name, period, stat, sign * delta, ts))
+
+    def set_roster_entry(self, game_id, player):
+        """Buffers a player's roster entry (number, starter) for a game."""
+        with self._lock:
+            self._buffer.append(('roster', game_id, player['name'], player['number'], player['starter']))
+
+    def flush(self):
+        """Writes buffered rows in a single transaction."""
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+            if not buffer:
+                return
+            with self._conn:
+                for row in buffer:
+                    if row[0] == 'stat':
+                        _, game_id, team, player_name, period, stat, delta, ts = row
+                        player_id = self._player_id(player_name) if player_name is not None else None
+                        self._conn.execute(
+                            "INSERT INTO stat_events (game_id, team, player_id, period, stat, delta, ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (game_id, team, player_id, period, stat, delta, ts))
+                    else:
+                        _, game_id, name, number, starter = row
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO game_players (game_id, player_id, number, starter) VALUES (?, ?, ?, ?)",
+                            (game_id, self._player_id(name), number, int(bool(starter))))
+
+    def import_game(self, data, label=None):
+        """
+        Adds a finished game from a StatsTracker game_data dictionary (e.g. an
+        archived basketball_stats.json). Totals are stored as period 'ALL'.
+        Returns the new game id.
+        """
+        game_id = self.start_game(label)
+        with self._lock:
+            for player in data['roster'].get('Team1', []):
+                self.set_roster_entry(game_id, player)
+                self.record(game_id, 'Team1', player['name'], 'ALL', data['player_stats'].get(player['name'], {}))
+            self.record(game_id, 'Team1', None, 'ALL', data['team1_team_rebounds'])
+            self.record(game_id, 'Team2', None, 'ALL', data['team2_generic_stats'])
+        self.end_game(game_id, data['team_score']['Team1'], data['team_score']['Team2'])
+        return game_id
+
+    def import_game_file(self, path, label=None):
+        """Imports a saved basketball_stats.json file as a finished game."""
+        with open(path, 'r') as f:
+            return self.import_game(json.load(f), label or path)
+
+    # --- QUERIES ---
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            self.flush()
+            return self._conn.execute(sql, params).fetchall()
+
+    def list_games(self):
+        """Returns [{'id', 'label', 'started_at', 'ended_at', 'team1_score', 'team2_score'}] oldest first."""
+        rows = self._query("SELECT id, label, started_at, ended_at, team1_score, team2_score FROM games ORDER BY id")
+        keys = ('id', 'label', 'started_at', 'ended_at', 'team1_score', 'team2_score')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def game_box_score(self, game_id, periods=None):
+        """Returns {player_name: {stat: total}} for one game, optionally limited to some periods."""
+        sql = ("SELECT p.name, e.stat, SUM(e.delta) FROM stat_events e JOIN players p ON p.id = e.player_id "
+               "WHERE e.game_id = ?")
+        params = [game_id]
+        if periods:
+            sql += f" AND e.period IN ({', '.join('?' for _ in periods)})"
+            params.extend(periods)
+        sql += " GROUP BY p.name, e.stat"
+        return _nest(self._query(sql, params))
+
+    def team_game_totals(self, game_id, team):
+        """Returns {stat: total} for a team in one game, including player and team-level stats."""
+        rows = self._query(
+            "SELECT stat, SUM(delta) FROM stat_events WHERE game_id = ? AND team = ? GROUP BY stat",
+            (game_id, team))
+        return dict(rows)
+
+    def season_box_score(self):
+        """Returns {player_name: {stat: total}} summed over every game in the database."""
+        return _nest(self._query(
+            "SELECT p.name, e.stat, SUM(e.delta) FROM stat_events e JOIN players p ON p.id = e.player_id "
+            "GROUP BY p.name, e.stat"))
+
+    def player_career_totals(self, player_name):
+        """Returns {stat: total} for one player across all games, plus 'Games' played."""
+        totals = dict(self._query(
+            "SELECT e.stat, SUM(e.delta) FROM stat_events e JOIN players p ON p.id = e.player_id "
+            "WHERE p.name = ? GROUP BY e.stat", (player_name,)))
+        games = self._query(
+            "SELECT COUNT(*) FROM game_players gp JOIN players p ON p.id = gp.player_id WHERE p.name = ?",
+            (player_name,))
+        totals['Games'] = games[0][0]
+        return totals
+
+
+def _nest(rows):
+    """Turns (name, stat, total) rows into {name: {stat: total}}."""
+    nested = {}
+    for name, stat, total in rows:
+        nested.setdefault(name, {})[stat] = total
+    return nested
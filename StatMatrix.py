@@ -0,0 +1,83 @@
+# NumPy is imported on first use by available(), so importing StatsTracker stays fast
+# while the matrix is switched off (the default)
+np = None
+_import_tried = False
+
+
+def available():
+    """Returns True if NumPy is installed and the matrix store can be used."""
+    global np, _import_tried
+    if not _import_tried:
+        _import_tried = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:  # NumPy is optional; StatsTracker falls back to plain dicts
+            pass
+    return np is not None
+
+
+class StatMatrix:
+    """
+    Array-backed mirror of player stats: one int32 row per roster player and
+    one column per stat key, in the fixed order of stat_keys. Team totals,
+    shooting percentages and leaderboards become single vectorized operations.
+    """
+
+    def __init__(self, player_names, player_stats, stat_keys, scoring_map):
+        self.stat_keys = list(stat_keys)
+        self.column = {key: i for i, key in enumerate(self.stat_keys)}
+        self.names = list(player_names)
+        self.row = {name: i for i, name in enumerate(self.names)}
+        self.values = np.zeros((len(self.names), len(self.stat_keys)), dtype=np.int32)
+
+        for name, i in self.row.items():
+            stats = player_stats.get(name, {})
+            for key, j in self.column.items():
+                self.values[i, j] = stats.get(key, 0)
+
+        # Column index pairs (made, attempted) for each shot type
+        self.shot_columns = {
+            made_key: (self.column[made_key], self.column[val['attempt_key']])
+            for made_key, val in scoring_map.items()
+        }
+
+    def apply_effects(self, player_name, effects, sign=1):
+        """Adds a stat event's per-stat effects to the player's row."""
+        i = self.row.get(player_name)
+        if i is None:
+            return
+        for key, delta in effects.items():
+            j = self.column.get(key)
+            if j is not None:
+                self.values[i, j] += sign * delta
+
+    def team_totals(self):
+        """Returns {stat_key: total} summed over every player."""
+        totals = self.values.sum(axis=0)
+        return {key: int(totals[j]) for key, j in self.column.items()}
+
+    def shooting_percentages(self):
+        """Returns {made_key: float array} of per-player percentages, 0.0 where nothing was attempted."""
+        percentages = {}
+        for made_key, (made_col, attempt_col) in self.shot_columns.items():
+            made = self.values[:, made_col].astype(np.float64)
+            attempted = self.values[:, attempt_col].astype(np.float64)
+            ratio = np.divide(made, attempted, out=np.zeros_like(made), where=attempted > 0)
+            percentages[made_key] = np.round(ratio * 100, 1)
+        return percentages
+
+    def player_rows(self):
+        """Yields (name, {stat_key: value}) for each player, in roster order."""
+        rows = self.values.tolist()
+        for name, row in zip(self.names, rows):
+            yield name, dict(zip(self.stat_keys, row))
+
+    def leaderboard(self, stat_key, limit=None):
+        """Returns [(name, value)] sorted by stat_key, highest first."""
+        column = self.values[:, self.column[stat_key]]
+        # Stable sort on the negated column keeps roster order for ties
+        order = np.argsort(-column.astype(np.int64), kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return [(self.names[i], int(column[i])) for i in order]
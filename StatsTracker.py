@@ -1,23 +1,42 @@
 import json
 import os
-import copy 
+import copy
+import time
+import atexit
+import bisect
+import threading
+from contextlib import contextmanager
+from Persistence import WriteBehindWriter, atomic_write
+import StatMatrix
+import SeasonStore
+import CompactFormat
 
 # --- CONFIGURATION ---
 STATS_FILE = "basketball_stats.json"
-HISTORY_FILE = "action_history.json"
-MAX_HISTORY = 50 
+HISTORY_FILE = "action_history.jsonl"
+LEGACY_HISTORY_FILE = "action_history.json" # Undo snapshots of older versions; migrated to HISTORY_FILE on load
+SEASON_DB_FILE = "season.db"
+SAVE_INTERVAL_S = 1.0  # Longest a change waits before being flushed to disk
+SAVE_IDLE_S = 0.25     # Flush early once updates pause for this long
+USE_STAT_MATRIX = False # Opt-in array-backed player stats; needs NumPy (see enable_stat_matrix)
+USE_SEASON_STORE = False # Opt-in SQLite season database in SEASON_DB_FILE (see attach_season_store)
+CHECKPOINT_INTERVAL = 100 # Events between time-travel checkpoints (see GameSession.state_at)
+STORAGE_FORMAT = 'json'   # 'compact' stores state and log as CompactFormat binary frames
+COMPACT_STATS_FILE = "basketball_stats.bsg"
+COMPACT_HISTORY_FILE = "action_history.bsl"
+COMPACT_COMPRESSION = True # zlib-compress large compact records (the base state, roster changes)
 
 # Detailed stat keys for Team 1 players
 STAT_KEYS_T1 = [
     "FT_Made", "FT_Attempted", "2P_Made", "2P_Attempted", "3P_Made", "3P_Attempted",
-    "Points", 
+    "Points",
     "Off_Rebounds", "Def_Rebounds", "Assists", "Steals", "Blocks", "Turnovers", "Fouls"
 ]
 
 # Generic team stats for Team 2 (and some Team 1 team stats)
 # Includes makes/attempts for accurate display in team comparison table
 TEAM_STAT_KEYS = [
-    "Points", "Off_Rebounds", "Def_Rebounds", "Assists", 
+    "Points", "Off_Rebounds", "Def_Rebounds", "Assists",
     "Steals", "Blocks", "Turnovers", "Fouls",
     "FT_Made", "FT_Attempted", "2P_Made", "2P_Attempted", "3P_Made", "3P_Attempted"
 ]
@@ -29,15 +48,17 @@ SCORING_MAP = {
     "3P_Made": {"points": 3, "attempt_key": "3P_Attempted"},
 }
 
-# Global Data Structures
-game_data = {}
-action_history = [] 
-
 DEFAULT_T1_PLAYERS = [
     {'name': "Player A", 'team': 'Team1', 'number': 1, 'starter': True},
     {'name': "Player B", 'team': 'Team1', 'number': 5, 'starter': True},
 ]
 
+# Named period sets a period filter can use besides single labels ('OT' selects every overtime)
+PERIOD_GROUPS = {
+    'H1': ['Q1', 'Q2'],
+    'H2': ['Q3', 'Q4'],
+}
+
 # Initial Quarterly Score Structure
 QUARTER_STRUCTURE = {
     'Q1': {'Team1': 0, 'Team2': 0, 'Cumulative1': 0, 'Cumulative2': 0},
@@ -48,396 +69,1503 @@ QUARTER_STRUCTURE = {
 
 DEFAULT_STATS = {
     'roster': {'Team1': DEFAULT_T1_PLAYERS},
-    'player_stats': {}, 
+    'player_stats': {},
     'team_score': {'Team1': 0, 'Team2': 0},
     'team1_team_rebounds': {k: 0 for k in ["Off_Rebounds", "Def_Rebounds"]},
     'team2_generic_stats': {k: 0 for k in TEAM_STAT_KEYS},
     'current_quarter': 'Q1',
     'quarterly_scores': copy.deepcopy(QUARTER_STRUCTURE),
-    'next_ot_num': 1 
+    'next_ot_num': 1,
+    'period_stats': {'players': {}, 'teams': {}}
 }
 
+# Passed to change listeners when the whole game state was replaced (load or reset)
+RESET_EVENT = {'type': 'reset'}
 
-# --- HISTORY & PERSISTENCE ---
+REQUIRED_KEYS = ['roster', 'player_stats', 'team_score', 'team1_team_rebounds', 'team2_generic_stats', 'current_quarter', 'quarterly_scores', 'next_ot_num']
 
-def save_data():
-    """Saves current game data to a JSON file."""
-    try:
-        with open(STATS_FILE, 'w') as f:
-            json.dump(game_data, f, indent=4)
-    except Exception as e:
-        print(f"Error saving stats data: {e}")
+# All disk writes of every session go through one write-behind writer thread
+_writer = WriteBehindWriter(SAVE_INTERVAL_S, SAVE_IDLE_S)
+atexit.register(_writer.close)
 
-def load_data():
-    """Loads game data from a JSON file, or initializes defaults."""
-    global game_data, action_history
-    
-    is_loaded = False
-    temp_data = {}
-    
-    if os.path.exists(STATS_FILE):
+
+# --- EVENT LOG ---
+# Every change to a game is a small event appended to its HISTORY_FILE, one JSON
+# object per line. Stat events carry the exact per-stat 'effects' they applied
+# and structural events carry the values they replaced, so undo is a single
+# inverse application instead of a restored snapshot, and undo depth is unlimited:
+# memory grows with the size of each change, not the size of the game. Undone events
+# move to a redo stack ('redo' records re-apply them) until a new event is logged.
+# With a GameClock attached, events also carry the game clock ('clock', tenths of
+# a second left in the period).
+#
+# Every event is tagged with the period it happened in, and stat events also add
+# their effects to game_data['period_stats'], a sparse (player or team, period, stat)
+# counter index: {'players': {name: {period: {stat: n}}}, 'teams': {team: {...}}}.
+# Stats for any set of periods are sums over that index, and the quarterly_scores
+# rows (per-period and cumulative scores, in period order) are derived from it and
+# kept current as events are applied, so nobody types in end-of-period scores.
+
+def _new_event(data, event_type, **fields):
+    """Builds an event tagged with the game's current period and a timestamp."""
+    event = {'type': event_type, 'period': data.get('current_quarter', 'Q1'), 'ts': round(time.time(), 3)}
+    event.update(fields)
+    return event
+
+def affected_keys(event):
+    """
+    Names the parts of the game an event (or its undo) changes, for views that
+    redraw selectively: 'score', 'quarter', 'quarterly_scores', 'roster',
+    'team1', 'team2' and 'player:<name>'. RESET_EVENT affects 'all'.
+    """
+    event_type = event['type']
+    if event_type == 'player_stat':
+        keys = {'player:' + event['player'], 'team1'}
+    elif event_type == 'team_stat':
+        keys = {'team1' if event['team'] == 'Team1' else 'team2'}
+    elif event_type in ('roster', 'remove_player'):
+        return {'roster', 'player:' + event['name'], 'team1', 'score', 'quarterly_scores'}
+    elif event_type == 'quarter':
+        return {'quarter', 'quarterly_scores'}
+    elif event_type == 'quarter_score':
+        return {'quarterly_scores'}
+    else:
+        return {'all'}
+
+    if event['effects'].get('Points'):
+        keys.update(('score', 'quarterly_scores'))
+    return keys
+
+def _is_compact_file(path):
+    with open(path, 'rb') as f:
+        return f.read(len(CompactFormat.MAGIC)) == CompactFormat.MAGIC
+
+def _read_log(path):
+    """
+    Yields the records of an event log, JSON lines or CompactFormat (detected
+    from the file header), one at a time. Corrupt records are skipped.
+    """
+    if _is_compact_file(path):
+        with open(path, 'rb') as f:
+            yield from CompactFormat.iter_records(f)
+        return
+
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping corrupt history record: {e}")
+
+def _count_log_records(path):
+    """
+    Counts the complete records in an event log without parsing them. A record
+    cut off at the end (a crash mid-write) is truncated away, so new records are
+    not appended onto it.
+    """
+    if _is_compact_file(path):
+        count, end = CompactFormat.count_records(path)
+    else:
+        count = end = offset = 0
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                count += chunk.count(b'\n')
+                if b'\n' in chunk:
+                    end = offset + chunk.rindex(b'\n') + 1
+                offset += len(chunk)
+    if end < os.path.getsize(path):
+        print("Dropping an incomplete record at the end of the event log")
+        os.truncate(path, end)
+    return count
+
+def _read_stats_file(path):
+    """
+    Reads a saved game_data file, JSON or CompactFormat. Returns (data, log_records):
+    the number of event log records the saved state reflects, or None if unknown.
+    """
+    if _is_compact_file(path):
+        data = CompactFormat.load_state(path)
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    return data, data.pop('log_records', None)
+
+def _replay_log(path):
+    """Rebuilds game data and the undo and redo stacks from an event log file."""
+    data = copy.deepcopy(DEFAULT_STATS)
+    events = []
+    redo = []
+    for record in _read_log(path):
         try:
-            with open(STATS_FILE, 'r') as f:
-                temp_data = json.load(f)
+            if record['type'] == 'base':
+                data = record['state']
+                _ensure_period_stats(data)
+            elif record['type'] == 'meta':
+                data.update(record['fields'])
+            elif record['type'] == 'undo':
+                if events:
+                    _apply_event(data, events[-1], -1)
+                    redo.append(events.pop())
+            elif record['type'] == 'redo':
+                if redo:
+                    _apply_event(data, redo[-1])
+                    events.append(redo.pop())
+            else:
+                _apply_event(data, record)
+                events.append(record)
+                redo = []
+        except (KeyError, TypeError, ValueError, IndexError, AttributeError) as e:
+            # A record that parses but does not apply (e.g. a damaged tail) is dropped on its own
+            print(f"Skipping unusable history record: {e!r}")
+    return data, events, redo
+
+def _legacy_events(state, after, ts):
+    """
+    Events that turn state into after, for migrating the full-state undo snapshots
+    older versions kept in LEGACY_HISTORY_FILE. Each event is applied to state
+    as it is made. Derived values (scores, quarterly rows) are not compared.
+    """
+    events = []
+
+    def add(event):
+        _apply_event(state, event)
+        events.append(event)
+
+    def new_event(event_type, **fields):
+        return {'type': event_type, 'period': state.get('current_quarter', 'Q1'), 'ts': ts, **fields}
+
+    # Players taken off the roster, and stats dropped for players no longer on it
+    after_names = {p['name'] for p in after['roster'].get('Team1', [])}
+    removed_names = [p['name'] for p in state['roster'].get('Team1', []) if p['name'] not in after_names]
+    removed_names += [name for name in state['player_stats'] if name not in after['player_stats'] and name not in removed_names]
+    for name in removed_names:
+        add(new_event('remove_player', name=name,
+                      removed=[[i, copy.deepcopy(p)] for i, p in enumerate(state['roster']['Team1']) if p['name'] == name],
+                      stats=copy.deepcopy(state['player_stats'].get(name)),
+                      period_stats=copy.deepcopy(state['period_stats']['players'].get(name))))
+
+    for team, players in after['roster'].items():
+        for player in players:
+            current = state['roster'].get(team, [])
+            index = next((i for i, p in enumerate(current) if p['name'] == player['name']), None)
+            if index is not None and current[index] == player:
+                continue
+            add(new_event('roster', name=player['name'], team=team, number=player['number'], starter=player['starter'],
+                          index=index, previous=copy.deepcopy(current[index]) if index is not None else None,
+                          new_stats=player['name'] not in state['player_stats']))
+
+    def stat_changes(before, stats):
+        # Keys missing on either side count as 0 (older files leave out stats never recorded)
+        keys = list(stats) + [key for key in before if key not in stats]
+        effects = {key: stats.get(key, 0) - before.get(key, 0) for key in keys if stats.get(key, 0) != before.get(key, 0)}
+        # Name the event after the stat that was entered, not the attempts or points a make implied
+        made = [key for key in effects if key.endswith('_Made')]
+        stat = made[0] if made else next((key for key in effects if key != 'Points'), next(iter(effects), None))
+        return stat, effects
+
+    for name, stats in after['player_stats'].items():
+        stat, effects = stat_changes(state['player_stats'].get(name, {}), stats)
+        if effects:
+            add(new_event('player_stat', player=name, stat=stat, delta=effects[stat], effects=effects))
+    for team, key in (('Team1', 'team1_team_rebounds'), ('Team2', 'team2_generic_stats')):
+        stat, effects = stat_changes(state[key], after[key])
+        if effects:
+            add(new_event('team_stat', team=team, stat=stat, delta=effects[stat], effects=effects))
+
+    if after.get('current_quarter', 'Q1') != state.get('current_quarter', 'Q1'):
+        add(new_event('quarter', quarter=after.get('current_quarter', 'Q1'), previous=state.get('current_quarter', 'Q1')))
+    return events
+
+def _legacy_state_matches(state, saved):
+    """Whether a migrated state has the saved file's roster, stats and period (zero stats ignored)."""
+    def recorded(d):
+        nonzero = lambda stats: {key: value for key, value in stats.items() if value}
+        players = {name: nonzero(stats) for name, stats in d['player_stats'].items()}
+        return (d['roster'], {name: stats for name, stats in players.items() if stats},
+                nonzero(d['team1_team_rebounds']), nonzero(d['team2_generic_stats']), d.get('current_quarter', 'Q1'))
+    return recorded(state) == recorded(saved)
+
+def _stat_target(data, event):
+    """Returns the stat dictionary a stat event's effects apply to."""
+    if event['type'] == 'player_stat':
+        if event['player'] not in data['player_stats']:
+            data['player_stats'][event['player']] = {k: 0 for k in STAT_KEYS_T1}
+        return data['player_stats'][event['player']]
+    if event['team'] == 'Team1':
+        return data['team1_team_rebounds']
+    return data['team2_generic_stats']
+
+def _apply_period_split(data, event, sign=1):
+    """
+    Adds a stat event's effects to its owner's split for the event's period (or
+    takes them out). Zero values are dropped, so undoing an event leaves no
+    trace in the splits.
+    """
+    owners = data['period_stats']['players' if event['type'] == 'player_stat' else 'teams']
+    owner = event['player'] if event['type'] == 'player_stat' else event['team']
+    periods = owners.setdefault(owner, {})
+    split = periods.setdefault(event['period'], {})
+    for key, delta in event['effects'].items():
+        value = split.get(key, 0) + sign * delta
+        if value:
+            split[key] = value
+        else:
+            split.pop(key, None)
+    if not split:
+        del periods[event['period']]
+        if not periods:
+            del owners[owner]
+
+def _apply_event(data, event, sign=1):
+    """Applies an event to data (sign=1) or reverts it (sign=-1)."""
+    event_type = event['type']
+
+    if event_type in ('player_stat', 'team_stat'):
+        stats = _stat_target(data, event)
+        for key, delta in event['effects'].items():
+            stats[key] = stats.get(key, 0) + sign * delta
+        _apply_period_split(data, event, sign)
+
+    elif event_type == 'roster':
+        roster_list = data['roster'].setdefault(event['team'], [])
+        if sign > 0:
+            new_player = {'name': event['name'], 'team': event['team'], 'number': event['number'], 'starter': event['starter']}
+            if event['index'] is None:
+                roster_list.append(new_player)
+            else:
+                roster_list[event['index']] = new_player
+            if event['new_stats']:
+                data['player_stats'][event['name']] = {k: 0 for k in STAT_KEYS_T1}
+        else:
+            if event['index'] is None:
+                roster_list.pop()
+            else:
+                roster_list[event['index']] = copy.deepcopy(event['previous'])
+            if event['new_stats']:
+                data['player_stats'].pop(event['name'], None)
+
+    elif event_type == 'remove_player':
+        roster_list = data['roster'].get('Team1', [])
+        if sign > 0:
+            data['roster']['Team1'] = [p for p in roster_list if p['name'] != event['name']]
+            data['player_stats'].pop(event['name'], None)
+            data['period_stats']['players'].pop(event['name'], None)
+        else:
+            for index, player in event['removed']:
+                roster_list.insert(index, copy.deepcopy(player))
+            data['roster']['Team1'] = roster_list
+            if event['stats'] is not None:
+                data['player_stats'][event['name']] = copy.deepcopy(event['stats'])
+            if event.get('period_stats') is not None:
+                data['period_stats']['players'][event['name']] = copy.deepcopy(event['period_stats'])
+
+    elif event_type == 'quarter':
+        data['current_quarter'] = event['quarter'] if sign > 0 else event['previous']
+
+    # 'quarter_score' events (typed-in end-of-period scores) only appear in older
+    # logs; the period rows are now derived from the stat events themselves
+
+def _ensure_period_stats(data):
+    """
+    Adds period_stats to game data saved before stats were split by period.
+    Stats recorded until then cannot be placed in a period, so they are
+    credited to the current one.
+    """
+    if 'period_stats' in data:
+        return
+    period = data.get('current_quarter', 'Q1')
+
+    def whole_game(stats):
+        nonzero = {key: value for key, value in stats.items() if value}
+        return {period: nonzero} if nonzero else None
+
+    owners = {'players': {name: whole_game(stats) for name, stats in data['player_stats'].items()},
+              'teams': {'Team1': whole_game(data['team1_team_rebounds']), 'Team2': whole_game(data['team2_generic_stats'])}}
+    data['period_stats'] = {kind: {owner: split for owner, split in splits.items() if split}
+                            for kind, splits in owners.items()}
+
+def _period_selector(periods):
+    """
+    Returns a predicate on period labels for a period filter: a label ('Q4'), a
+    PERIOD_GROUPS name ('H1', 'H2'), 'OT' for every overtime, or a list of these.
+    """
+    if isinstance(periods, str):
+        periods = [periods]
+    labels = set()
+    every_overtime = False
+    for period in periods:
+        if period == 'OT':
+            every_overtime = True
+        else:
+            labels.update(PERIOD_GROUPS.get(period, [period]))
+    return lambda label: label in labels or (every_overtime and label.startswith('OT'))
+
+def _sum_periods(splits, selected, totals=None):
+    """Adds one owner's {period: {stat: n}} splits for the selected periods into totals (a new dict if None)."""
+    totals = {} if totals is None else totals
+    for period, stats in splits.items():
+        if selected(period):
+            for key, value in stats.items():
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+def _period_sort_key(label):
+    """Orders Q1-Q4, then OT1, OT2, ..., then any other label."""
+    if label.startswith('Q') and label[1:].isdigit():
+        return (0, int(label[1:]), label)
+    if label.startswith('OT') and label[2:].isdigit():
+        return (1, int(label[2:]), label)
+    return (2, 0, label)
+
+def _rebuild_quarterly_scores(data, team1_names):
+    """
+    Rebuilds the quarterly_scores rows from the per-period splits: Q1-Q4, every
+    period anyone scored in or that is being played, and no gaps in the
+    overtimes, each with its score and the cumulative score after it.
+    """
+    period_stats = data['period_stats']
+    team1 = {}
+    for name in team1_names:
+        for period, stats in period_stats['players'].get(name, {}).items():
+            team1[period] = team1.get(period, 0) + stats.get('Points', 0)
+    team2 = {period: stats.get('Points', 0) for period, stats in period_stats['teams'].get('Team2', {}).items()}
+
+    periods = set(QUARTER_STRUCTURE) | {data.get('current_quarter', 'Q1')}
+    periods.update(period for period, points in team1.items() if points)
+    periods.update(period for period, points in team2.items() if points)
+    last_ot = max((int(p[2:]) for p in periods if p.startswith('OT') and p[2:].isdigit()), default=0)
+    periods.update(f"OT{n}" for n in range(1, last_ot + 1))
+
+    rows = {}
+    cumulative1 = cumulative2 = 0
+    for period in sorted(periods, key=_period_sort_key):
+        score1, score2 = team1.get(period, 0), team2.get(period, 0)
+        cumulative1 += score1
+        cumulative2 += score2
+        rows[period] = {'Team1': score1, 'Team2': score2, 'Cumulative1': cumulative1, 'Cumulative2': cumulative2}
+    data['quarterly_scores'] = rows
+    data['next_ot_num'] = last_ot + 1
+
+def _add_period_points(data, period, team, points):
+    """
+    Adds a team's points to its row for period and to the cumulative score of that
+    row and every later one. Returns False if there is no row for period yet.
+    """
+    rows = data['quarterly_scores']
+    if period not in rows:
+        return False
+    side = '1' if team == 'Team1' else '2'
+    rows[period]['Team' + side] += points
+    later = False
+    for label, row in rows.items():
+        later = later or label == period
+        if later:
+            row['Cumulative' + side] += points
+    return True
+
+def _recalculate_period_points(splits):
+    """Sets Points in one owner's {period: {stat: n}} splits from that period's makes, with the current SCORING_MAP."""
+    for period, stats in list(splits.items()):
+        points = sum(stats.get(key, 0) * val['points'] for key, val in SCORING_MAP.items())
+        if points:
+            stats['Points'] = points
+        else:
+            stats.pop('Points', None)
+            if not stats:
+                del splits[period]
+
+def _refresh_scores(data):
+    """Recomputes team_score and the period rows for a standalone game_data dictionary (e.g. a reconstructed past state)."""
+    _ensure_period_stats(data)
+    data['team_score']['Team1'] = sum(data['player_stats'].get(p['name'], {}).get('Points', 0) for p in data['roster']['Team1'])
+    data['team_score']['Team2'] = data['team2_generic_stats'].get('Points', 0)
+    _rebuild_quarterly_scores(data, {p['name'] for p in data['roster']['Team1']})
+
+def _clamp_attempt_effects(stats, effects, made_keys=SCORING_MAP):
+    """Adds the attempt increases needed to keep attempts at least as high as makes."""
+    for made_key in made_keys:
+        attempt_key = SCORING_MAP[made_key]['attempt_key']
+        made = stats.get(made_key, 0) + effects.get(made_key, 0)
+        attempted = stats.get(attempt_key, 0) + effects.get(attempt_key, 0)
+        if attempted < made:
+            effects[attempt_key] = effects.get(attempt_key, 0) + made - attempted
+    return effects
+
+
+# --- DATA RETRIEVAL HELPERS ---
+
+def _safe_percentage(made, attempted):
+    """Calculates percentage, returning 0.0 if attempted is zero."""
+    return round(made / attempted * 100, 1) if attempted > 0 else 0.0
+
+def _player_entry(player, stats, ft_pct, twop_pct, threep_pct):
+    """Builds the GUI-facing stats dictionary for one player."""
+    return {
+        'name': player['name'],
+        'team': player['team'],
+        'number': player['number'],
+        'starter': player['starter'],
+        'Points': stats.get('Points', 0),
+        'Assists': stats.get('Assists', 0),
+        'Steals': stats.get('Steals', 0),
+        'Blocks': stats.get('Blocks', 0),
+        'Turnovers': stats.get('Turnovers', 0),
+        'Fouls': stats.get('Fouls', 0),
+        'Off_Rebounds': stats.get('Off_Rebounds', 0),
+        'Def_Rebounds': stats.get('Def_Rebounds', 0),
+        'FT_PCT': ft_pct,
+        '2P_PCT': twop_pct,
+        '3P_PCT': threep_pct,
+        'FT_Made': stats.get('FT_Made', 0), 'FT_Attempted': stats.get('FT_Attempted', 0),
+        '2P_Made': stats.get('2P_Made', 0), '2P_Attempted': stats.get('2P_Attempted', 0),
+        '3P_Made': stats.get('3P_Made', 0), '3P_Attempted': stats.get('3P_Attempted', 0)
+    }
+
+
+# --- GAME SESSION ---
+
+class GameSession:
+    """
+    One game: its state, undo history and storage location. Nothing is read
+    from disk until the state is first needed (or load_data() is called), so
+    sessions are cheap to create and one process can hold many of them.
+    """
+
+    def __init__(self, directory=None, writer=None, storage_format=None):
+        self.directory = directory
+        # 'json' or 'compact' (see CompactFormat); CompactFormat.convert() moves a game between them
+        self.compact = (storage_format or STORAGE_FORMAT) == 'compact'
+        stats_name, history_name = (COMPACT_STATS_FILE, COMPACT_HISTORY_FILE) if self.compact else (STATS_FILE, HISTORY_FILE)
+        self.stats_file = os.path.join(directory, stats_name) if directory else stats_name
+        self.history_file = os.path.join(directory, history_name) if directory else history_name
+        self.legacy_history_file = os.path.join(directory, LEGACY_HISTORY_FILE) if directory else LEGACY_HISTORY_FILE
+        self.writer = writer or _writer
+        self.use_stat_matrix = USE_STAT_MATRIX
+        self.season_store = None
+        self.clock = None  # Optional GameClock.GameClock; events are stamped with its game clock
+
+        # Mutations hold the lock so the writer thread never serializes a half-applied update
+        self.lock = threading.RLock()
+        self._data = None
+        # Both None until first needed when the state was loaded from the stats file (see history)
+        self._history = []
+        self._redo = []  # Undone events, most recently undone last; cleared by any new event
+        self._log_started = False
+        self._log_records = 0  # Records in the event log, saved with the state to detect a stale stats file
+        # [(event index, compact JSON of the state after that many events)], built on first use
+        self._checkpoints = None
+        # {period: ([event indices], [indices of events with a clock], [-lowest clock up to each])}, built on first use
+        self._period_index = None
+
+        # Derived from the game data and kept current incrementally by stat events;
+        # rebuilt from scratch by _recalculate_all_scores()
+        self._team1_names = set()
+        self._team1_totals = {k: 0 for k in STAT_KEYS_T1}
+        self._stat_matrix = None
+        self._listeners = []
+
+        # Open input batch (see begin_batch): log lines and notifications held until it ends
+        self._batch_depth = 0
+        self._batch_lines = []
+        self._batch_notices = []
+        self._batch_dirty = False
+
+    @classmethod
+    def from_data(cls, data, history=None):
+        """
+        A session over game data that is already in memory (e.g. replayed from an
+        archived log). Scores are recalculated from the stats with the current
+        SCORING_MAP; nothing is read from disk.
+        """
+        session = cls()
+        with session.lock:
+            session._data = data
+            session._history = list(history or [])
+            session._recalculate_all_scores()
+        return session
+
+    @property
+    def data(self):
+        """The game_data dictionary, loaded on first access."""
+        if self._data is None:
+            self.load_data()
+        return self._data
+
+    @property
+    def history(self):
+        """The undo stack of applied events, oldest first (read from the event log on first use)."""
+        if self._data is None:
+            self.load_data()
+        if self._history is None:
+            self._load_history()
+        return self._history
+
+    def _load_history(self):
+        """Reads the undo and redo stacks from the event log, once, when first needed."""
+        self._flush_batch_lines()
+        self.writer.flush()
+        with self.lock:
+            if self._history is None:
+                _, self._history, self._redo = _replay_log(self.history_file)
+
+    # --- HISTORY & PERSISTENCE ---
+
+    def _render_stats(self):
+        with self.lock:
+            state = {**self._data, 'log_records': self._log_records}
+            if self.compact:
+                return CompactFormat.dump_state(state, COMPACT_COMPRESSION)
+            return json.dumps(state, indent=4)
+
+    def save_data(self):
+        """Marks game data dirty; the write-behind thread saves it atomically."""
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
+        self.writer.mark_dirty(self.stats_file, self._render_stats)
+
+    def flush_data(self):
+        """Synchronously writes any pending changes (call before quitting)."""
+        self.writer.flush()
+
+    def load_data(self):
+        """
+        Loads game data. With an event log, the saved stats file is used as is when
+        it reflects every record in the log, and the undo history is read from the
+        log only when first needed; otherwise the state is rebuilt from the log.
+        """
+        self._flush_batch_lines()
+        self.writer.flush()
+
+        if not os.path.exists(self.history_file) and os.path.exists(self.legacy_history_file):
+            self._migrate_legacy_history()
+
+        if os.path.exists(self.history_file):
+            log_records = _count_log_records(self.history_file)
+            saved = self._read_synced_stats(log_records)
+            with self.lock:
+                if saved is not None:
+                    self._data, self._history, self._redo = saved, None, None
+                else:
+                    self._data, self._history, self._redo = _replay_log(self.history_file)
+                self._log_started = True
+                self._log_records = log_records
+                self._checkpoints = None
+                self._period_index = None
+                self._recalculate_all_scores()
+                self._notify(RESET_EVENT)
+            return
+
+        is_loaded = False
+        temp_data = {}
+
+        if os.path.exists(self.stats_file):
+            try:
+                temp_data, _ = _read_stats_file(self.stats_file)
                 is_loaded = True
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"Error reading stats file: {e}. Starting with default data.")
+            except (ValueError, KeyError) as e:
+                print(f"Error reading stats file: {e}. Starting with default data.")
 
-    required_keys = ['roster', 'player_stats', 'team_score', 'team1_team_rebounds', 'team2_generic_stats', 'current_quarter', 'quarterly_scores', 'next_ot_num']
-    
-    if is_loaded and all(key in temp_data for key in required_keys):
-        game_data = temp_data
-    else:
-        if is_loaded:
-            print("Loaded data is corrupted/incomplete. Reverting to default data.")
-        game_data = copy.deepcopy(DEFAULT_STATS)
-        save_data() 
-
-    # Load History (Optional)
-    try:
-        if os.path.exists(HISTORY_FILE):
-            with open(HISTORY_FILE, 'r') as f:
-                action_history = json.load(f)
+        with self.lock:
+            if is_loaded and all(key in temp_data for key in REQUIRED_KEYS):
+                self._data = temp_data
+            else:
+                if is_loaded:
+                    print("Loaded data is corrupted/incomplete. Reverting to default data.")
+                self._data = copy.deepcopy(DEFAULT_STATS)
+                self.save_data()
+
+            self._history = []
+            self._redo = []
+            self._log_started = False
+            self._log_records = 0
+            self._checkpoints = None
+            self._period_index = None
+            self._recalculate_all_scores()
+            self._notify(RESET_EVENT)
+
+    def _migrate_legacy_history(self):
+        """
+        Turns the undo snapshots of an older version (LEGACY_HISTORY_FILE, the states
+        before each of the last actions) into an event log ending at the saved
+        stats, so the undo history survives the upgrade, and removes the old file.
+        If the migrated events do not reproduce the saved stats, nothing is written
+        and the old file is left in place.
+        """
+        try:
+            with open(self.legacy_history_file, 'r') as f:
+                snapshots = json.load(f)
+            current, _ = _read_stats_file(self.stats_file)
+            ts = round(os.path.getmtime(self.legacy_history_file), 3)
+
+            records = []
+            if snapshots and all(key in current for key in REQUIRED_KEYS):
+                state = copy.deepcopy(snapshots[0])
+                _ensure_period_stats(state)
+                records.append({'type': 'base', 'state': copy.deepcopy(state)})
+                for after in snapshots[1:] + [current]:
+                    records.extend(_legacy_events(state, after, ts))
+
+                # Replay the log as load_data will, and only keep it if it ends at the saved stats
+                replayed = copy.deepcopy(records[0]['state'])
+                for record in records[1:]:
+                    _apply_event(replayed, record)
+                if not _legacy_state_matches(replayed, current):
+                    print(f"Could not migrate the undo history in {self.legacy_history_file}: "
+                          f"it does not end at the saved stats. Starting with empty history.")
+                    return
+        except (OSError, ValueError, KeyError, TypeError, IndexError, AttributeError) as e:
+            print(f"Error migrating undo history: {e}. Starting with empty history.")
+            return
+
+        if records:
+            if self.compact:
+                text = CompactFormat.MAGIC + b"".join(CompactFormat.encode_record(r, COMPACT_COMPRESSION) for r in records)
+            else:
+                text = "".join(json.dumps(r) + "\n" for r in records)
+            atomic_write(self.history_file, text)
+        try:
+            os.remove(self.legacy_history_file)
+        except OSError as e:
+            print(f"Error removing {self.legacy_history_file}: {e}")
+
+    def _read_synced_stats(self, log_records):
+        """The saved state if the stats file was written after exactly log_records log records, else None."""
+        if not os.path.exists(self.stats_file):
+            return None
+        try:
+            data, saved_records = _read_stats_file(self.stats_file)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading stats file: {e}. Rebuilding from the event log.")
+            return None
+        if saved_records != log_records or not all(key in data for key in REQUIRED_KEYS):
+            return None
+        if 'period_stats' not in data:
+            # Saved before scores were split by period: the log's events place every point
+            return None
+        return data
+
+    def _append_log(self, record):
+        """Queues one record to be appended to the event log."""
+        if not self._log_started:
+            # The log must be replayable on its own, so it opens with the state it started from.
+            self._log_started = True
+            if self.compact:
+                self._queue_log_line(CompactFormat.MAGIC)
+            self._append_log({'type': 'base', 'state': self._data})
+        self._log_records += 1
+        if self.compact:
+            self._queue_log_line(CompactFormat.encode_record(record, COMPACT_COMPRESSION))
+        else:
+            self._queue_log_line(json.dumps(record) + "\n")
+
+    def _queue_log_line(self, line):
+        if self._batch_depth:
+            self._batch_lines.append(line)
+        else:
+            self.writer.append(self.history_file, line)
+
+    def _commit_event(self, event):
+        """Applies a new event to the game, records it, and persists."""
+        if self.clock is not None:
+            event['clock'] = self.clock.game_clock_tenths()
+        with self.lock:
+            self._redo = []
+            self._push_event(event, event)
+        self.save_data()
+
+    def _push_event(self, event, record):
+        """Logs record, applies event and updates everything derived from it (caller holds the lock)."""
+        self._append_log(record)
+        _apply_event(self._data, event)
+        if self._history is not None:
+            # While unloaded, the history is rebuilt from the log (which now has this record)
+            self._history.append(event)
+            if self._checkpoints is not None and len(self._history) % CHECKPOINT_INTERVAL == 0:
+                self._checkpoints.append((len(self._history), json.dumps(self._data)))
+            if self._period_index is not None:
+                self._index_event(len(self._history) - 1, event)
+        self._update_scores(event)
+        self._record_season_event(event)
+        self._notify(event)
+
+    def undo_last_action(self):
+        """Reverts the most recent event by applying its inverse."""
+        if self.history:
+            with self.lock:
+                event = self._history.pop()
+                self._redo.append(event)
+                _apply_event(self._data, event, -1)
+                while self._checkpoints and self._checkpoints[-1][0] > len(self._history):
+                    self._checkpoints.pop()
+                if self._period_index is not None:
+                    self._unindex_event(len(self._history), event)
+                self._append_log({'type': 'undo', 'ts': round(time.time(), 3)})
+                self._update_scores(event, -1)
+                self._record_season_event(event, -1)
+                self._notify(event, -1)
+            self.save_data()
+            return True
+        return False
+
+    def redo_last_action(self):
+        """Re-applies the most recently undone event. Returns False if there is nothing to redo."""
+        if self.history is not None and self._redo:
+            with self.lock:
+                self._push_event(self._redo.pop(), {'type': 'redo', 'ts': round(time.time(), 3)})
+            self.save_data()
+            return True
+        return False
+
+    def reset_all_stats(self):
+        """Resets all game data and clears history. With a season store attached, the game is archived there first."""
+        with self.lock:
+            if self.season_store is not None and self._data is not None:
+                store, game_id, score, ended_at = self.season_store, self._data['season_game_id'], dict(self._data['team_score']), time.time()
+                self.writer.schedule(('end_game', id(store), game_id), lambda: store.end_game(game_id, score['Team1'], score['Team2'], ended_at))
+
+            self._data = copy.deepcopy(DEFAULT_STATS)
+            self._history = []
+            self._redo = []
+            self._log_started = False
+            self._log_records = 0
+            self._checkpoints = None
+            self._period_index = None
+            self._batch_lines = []  # The old log is deleted anyway
+            self._recalculate_all_scores()
+
+            if self.season_store is not None:
+                self._start_season_game()
+            self._notify(RESET_EVENT)
+
+        self.writer.remove(self.stats_file)
+        self.writer.remove(self.history_file)
+        self.save_data()
+
+    def attach_clock(self, clock):
+        """Stamps every new event with clock.game_clock_tenths() under 'clock' (None to stop)."""
+        self.clock = clock
+
+    # --- INPUT BATCHES ---
+    # Rapid input (e.g. several stat clicks within one GUI tick) can be grouped into a
+    # batch. Every update is still applied to the game state immediately and is its own
+    # undo step; only the log write, the save and the change notifications are
+    # deferred to the end of the batch, and happen once for all of its updates.
+
+    def begin_batch(self):
+        """Opens a batch (batches nest). Must be paired with end_batch()."""
+        with self.lock:
+            self._batch_depth += 1
+
+    def end_batch(self):
+        """Closes a batch; the outermost one writes, saves and notifies listeners in event order."""
+        with self.lock:
+            self._batch_depth -= 1
+            if self._batch_depth:
+                return
+            self._flush_batch_lines()
+            notices, self._batch_notices = self._batch_notices, []
+            for event, sign in notices:
+                self._notify(event, sign)
+            dirty, self._batch_dirty = self._batch_dirty, False
+        if dirty:
+            self.save_data()
+
+    @contextmanager
+    def batch(self):
+        """Context manager form of begin_batch()/end_batch()."""
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.end_batch()
+
+    def _flush_batch_lines(self):
+        with self.lock:
+            if self._batch_lines:
+                lines, self._batch_lines = self._batch_lines, []
+                self.writer.append(self.history_file, (b"" if self.compact else "").join(lines))
+
+    # --- CHANGE LISTENERS ---
+
+    def add_listener(self, callback):
+        """
+        Calls callback(session, event, sign) after every applied (sign=1) or undone
+        (sign=-1) event, and with RESET_EVENT when the whole state is replaced.
+        Callbacks run while the session lock is held, in event order (at the end
+        of the batch for updates made inside one).
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, event, sign=1):
+        if self._batch_depth:
+            self._batch_notices.append((event, sign))
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(self, event, sign)
+            except Exception as e:
+                print(f"Error in change listener: {e}")
+
+    def snapshot(self):
+        """Returns a deep copy of the game state."""
+        data = self.data
+        with self.lock:
+            return copy.deepcopy(data)
+
+    # --- SEASON STORE ---
+    # Optional SQLite database that keeps every game of the season. Each stat event is
+    # mirrored there as per-stat rows (undo writes the inverse rows), tagged with the
+    # game id kept in game_data['season_game_id'].
+
+    def attach_season_store(self, store_or_path=SEASON_DB_FILE):
+        """Starts mirroring this game into a season database (a SeasonStore or a path). Returns the store."""
+        if isinstance(store_or_path, SeasonStore.SeasonStore):
+            store = store_or_path
+        else:
+            store = SeasonStore.SeasonStore(store_or_path)
+        data = self.data
+        with self.lock:
+            self.season_store = store
+            game_id = data.get('season_game_id')
+            if game_id is None or not store.has_game(game_id):
+                self._start_season_game()
+                self._backfill_season_game()
+        return store
+
+    def _start_season_game(self):
+        """Creates the season row for the current game and remembers its id."""
+        game_id = self.season_store.start_game()
+        self._data['season_game_id'] = game_id
+        if self._log_started:
+            # Logs started before the game had an id carry it as a metadata record
+            self._append_log({'type': 'meta', 'fields': {'season_game_id': game_id}})
+        self.save_data()
+
+    def _backfill_season_game(self):
+        """Records stats logged before the store was attached, in the periods they were logged in."""
+        store, data = self.season_store, self._data
+        game_id = data['season_game_id']
+        splits = data['period_stats']
+        for player in data['roster']['Team1']:
+            store.set_roster_entry(game_id, player)
+            self._record_season_splits(game_id, 'Team1', player['name'], splits['players'].get(player['name'], {}))
+        self._record_season_splits(game_id, 'Team1', None, splits['teams'].get('Team1', {}))
+        self._record_season_splits(game_id, 'Team2', None, splits['teams'].get('Team2', {}))
+        self.writer.schedule(('season_store', id(store)), store.flush)
+
+    def _record_season_event(self, event, sign=1):
+        """Mirrors an applied (sign=1) or undone (sign=-1) event into the season store."""
+        store = self.season_store
+        if store is None:
+            return
+
+        game_id = self._data['season_game_id']
+        event_type = event['type']
+
+        if event_type == 'player_stat':
+            store.record(game_id, 'Team1', event['player'], event['period'], event['effects'], event['ts'], sign)
+        elif event_type == 'team_stat':
+            store.record(game_id, event['team'], None, event['period'], event['effects'], event['ts'], sign)
+        elif event_type == 'roster' and sign > 0:
+            store.set_roster_entry(game_id, {'name': event['name'], 'number': event['number'], 'starter': event['starter']})
+        elif event_type == 'remove_player' and event['stats']:
+            if event.get('period_stats'):
+                # Take the player's stats out of the periods they were logged in
+                self._record_season_splits(game_id, 'Team1', event['name'], event['period_stats'], event['ts'], -sign)
+            else:
+                store.record(game_id, 'Team1', event['name'], event['period'], event['stats'], event['ts'], -sign)
+        else:
+            return
+
+        self.writer.schedule(('season_store', id(store)), store.flush)
+
+    def _record_season_splits(self, game_id, team, player_name, splits, ts=None, sign=1):
+        """Records one owner's {period: {stat: n}} splits into the season store, period by period."""
+        for period, stats in splits.items():
+            self.season_store.record(game_id, team, player_name, period, stats, ts, sign)
+
+    # --- SCORE CALCULATION LOGIC ---
+
+    def _recalculate_player_score(self, player_name):
+        """Calculates points and updates attempts for a single player."""
+        stats = self._data['player_stats'].get(player_name, {})
+
+        total_points = 0
+        total_points += stats.get('FT_Made', 0) * SCORING_MAP['FT_Made']['points']
+        total_points += stats.get('2P_Made', 0) * SCORING_MAP['2P_Made']['points']
+        total_points += stats.get('3P_Made', 0) * SCORING_MAP['3P_Made']['points']
+
+        # Ensure attempts are at least as high as makes
+        for key, val in SCORING_MAP.items():
+            made = stats.get(key, 0)
+            attempt_key = val['attempt_key']
+            stats[attempt_key] = max(stats.get(attempt_key, 0), made)
+
+        stats['Points'] = total_points
+        self._data['player_stats'][player_name] = stats
+        return total_points
+
+    def _recalculate_all_scores(self):
+        """Recalculates scores for all teams and players."""
+        data = self._data
+        _ensure_period_stats(data)
+        total_t1_score = 0
+
+        for player in data['roster']['Team1']:
+            total_t1_score += self._recalculate_player_score(player['name'])
+
+        # Team 2 Points also follow from its makes
+        team2_stats = data['team2_generic_stats']
+        team2_stats['Points'] = sum(team2_stats.get(key, 0) * val['points'] for key, val in SCORING_MAP.items())
+        total_t2_score = team2_stats['Points']
+
+        data['team_score']['Team1'] = total_t1_score
+        data['team_score']['Team2'] = total_t2_score
+
+        self._team1_names = {player['name'] for player in data['roster']['Team1']}
+        self._team1_totals = self._sum_player_stats(self._team1_names)
+
+        # The period rows come from the per-period Points, so those follow the makes too
+        period_stats = data['period_stats']
+        for owners, names in ((period_stats['players'], self._team1_names), (period_stats['teams'], ['Team2'])):
+            for name in names:
+                if name in owners:
+                    _recalculate_period_points(owners[name])
+                    if not owners[name]:
+                        del owners[name]
+        _rebuild_quarterly_scores(data, self._team1_names)
+        self._rebuild_stat_matrix()
+
+    def _update_scores(self, event, sign=1):
+        """
+        Brings derived scores up to date after an event was applied (or reverted).
+        Stat events only touch the affected player's team totals, the team score
+        and the period rows from the event's period on; roster changes fall back
+        to a full recalculation, and period changes rebuild the period rows.
+        """
+        data = self._data
+        if event['type'] == 'player_stat':
+            if event['player'] in self._team1_names:
+                for key, delta in event['effects'].items():
+                    self._team1_totals[key] = self._team1_totals.get(key, 0) + sign * delta
+                points = sign * event['effects'].get('Points', 0)
+                data['team_score']['Team1'] += points
+                if points and not _add_period_points(data, event['period'], 'Team1', points):
+                    _rebuild_quarterly_scores(data, self._team1_names)
+                if self._stat_matrix is not None:
+                    self._stat_matrix.apply_effects(event['player'], event['effects'], sign)
+
+        elif event['type'] == 'team_stat':
+            if event['team'] == 'Team2':
+                data['team_score']['Team2'] = data['team2_generic_stats'].get('Points', 0)
+                points = sign * event['effects'].get('Points', 0)
+                if points and not _add_period_points(data, event['period'], 'Team2', points):
+                    _rebuild_quarterly_scores(data, self._team1_names)
+
+        elif event['type'] in ('roster', 'remove_player'):
+            self._recalculate_all_scores()
+
+        elif event['type'] == 'quarter':
+            _rebuild_quarterly_scores(data, self._team1_names)
+
+    def _sum_player_stats(self, player_names):
+        """Sums STAT_KEYS_T1 across the given players."""
+        totals = {k: 0 for k in STAT_KEYS_T1}
+        for name in player_names:
+            player_stats = self._data['player_stats'].get(name, {})
+            for key in totals:
+                totals[key] += player_stats.get(key, 0)
+        return totals
+
+    def _rebuild_stat_matrix(self):
+        """Rebuilds the array-backed Team 1 stats from the game data (if enabled)."""
+        if self.use_stat_matrix and StatMatrix.available():
+            names = [player['name'] for player in self._data['roster']['Team1']]
+            self._stat_matrix = StatMatrix.StatMatrix(names, self._data['player_stats'], STAT_KEYS_T1, SCORING_MAP)
         else:
-            action_history = []
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error loading history: {e}. Starting with empty history.")
-        action_history = []
-
-    _recalculate_all_scores()
-
-def _push_history():
-    """Saves a snapshot of the current state before an action."""
-    global action_history
-    snapshot = copy.deepcopy(game_data)
-    action_history.append(snapshot)
-    
-    if len(action_history) > MAX_HISTORY:
-        action_history.pop(0)
-    
-    try:
-        with open(HISTORY_FILE, 'w') as f:
-            json.dump(action_history, f, indent=4)
-    except Exception as e:
-        print(f"Error saving history data: {e}")
+            self._stat_matrix = None
+
+    def enable_stat_matrix(self, enabled=True):
+        """Turns the NumPy stat matrix on or off. Returns whether it is now active."""
+        self.use_stat_matrix = enabled
+        if self._data is not None:
+            with self.lock:
+                self._rebuild_stat_matrix()
+            return self._stat_matrix is not None
+        return enabled and StatMatrix.available()
+
+    def check_score_consistency(self):
+        """
+        Recomputes every score from scratch and compares it with the incrementally
+        maintained values. Returns a list of mismatch descriptions (empty if consistent).
+        """
+        data = self.data
+        team2_stats = data['team2_generic_stats']
+        expected_scores = {'Team1': 0, 'Team2': sum(team2_stats.get(key, 0) * val['points'] for key, val in SCORING_MAP.items())}
+        mismatches = []
+        if team2_stats.get('Points', 0) != expected_scores['Team2']:
+            mismatches.append(f"Team2 Points: {team2_stats.get('Points', 0)} != {expected_scores['Team2']}")
+
+        for player in data['roster']['Team1']:
+            stats = data['player_stats'].get(player['name'], {})
+            points = sum(stats.get(key, 0) * val['points'] for key, val in SCORING_MAP.items())
+            expected_scores['Team1'] += points
+            if stats.get('Points', 0) != points:
+                mismatches.append(f"{player['name']} Points: {stats.get('Points', 0)} != {points}")
+
+        for team, expected in expected_scores.items():
+            if data['team_score'][team] != expected:
+                mismatches.append(f"{team} score: {data['team_score'][team]} != {expected}")
+
+        expected_totals = self._sum_player_stats(p['name'] for p in data['roster']['Team1'])
+        for key, expected in expected_totals.items():
+            if self._team1_totals.get(key, 0) != expected:
+                mismatches.append(f"Team1 {key}: {self._team1_totals.get(key, 0)} != {expected}")
+
+        expected_periods = {'period_stats': data['period_stats'], 'current_quarter': data.get('current_quarter', 'Q1')}
+        _rebuild_quarterly_scores(expected_periods, self._team1_names)
+        if data['quarterly_scores'] != expected_periods['quarterly_scores']:
+            mismatches.append(f"quarterly scores: {data['quarterly_scores']} != {expected_periods['quarterly_scores']}")
+        for player in data['roster']['Team1']:
+            stats = data['player_stats'].get(player['name'], {})
+            split_totals = _sum_periods(data['period_stats']['players'].get(player['name'], {}), lambda period: True)
+            for key in STAT_KEYS_T1:
+                if split_totals.get(key, 0) != stats.get(key, 0):
+                    mismatches.append(f"{player['name']} {key} by period: {split_totals.get(key, 0)} != {stats.get(key, 0)}")
+
+        last_row = list(expected_periods['quarterly_scores'].values())[-1]
+        for team, side in (('Team1', 'Cumulative1'), ('Team2', 'Cumulative2')):
+            if last_row[side] != expected_scores[team]:
+                mismatches.append(f"{team} periods add up to {last_row[side]}, not {expected_scores[team]}")
+
+        return mismatches
+
+    # --- TIME TRAVEL ---
+    # Past states are rebuilt from the nearest checkpoint at or before the wanted event
+    # index plus a replay of at most CHECKPOINT_INTERVAL events, so the cost does not
+    # grow with the length of the game. Checkpoints are taken every CHECKPOINT_INTERVAL
+    # events as new events are committed; after a load or reset they are first built by
+    # walking the undo stack backwards from the current state. Likewise, each period's
+    # event indexes and clock readings are indexed as events are committed (and dropped
+    # on undo), so finding the event index for a period end or a clock time is a lookup.
+
+    def _build_checkpoints(self):
+        data = copy.deepcopy(self._data)
+        checkpoints = []
+        for index in range(len(self._history), -1, -1):
+            if index % CHECKPOINT_INTERVAL == 0:
+                checkpoints.append((index, json.dumps(data)))
+            if index:
+                _apply_event(data, self._history[index - 1], -1)
+        checkpoints.reverse()
+        self._checkpoints = checkpoints
+
+    def state_at(self, index):
+        """Returns a copy of the game data as it was after the first `index` events (0 = start, len(history) = now)."""
+        history = self.history
+        with self.lock:
+            if not 0 <= index <= len(history):
+                raise IndexError(f"event index {index} is outside 0..{len(history)}")
+            if self._checkpoints is None:
+                self._build_checkpoints()
+
+            checkpoint_index, state = self._checkpoints[min(index // CHECKPOINT_INTERVAL, len(self._checkpoints) - 1)]
+            data = json.loads(state)
+            for event in history[checkpoint_index:index]:
+                _apply_event(data, event)
+        _refresh_scores(data)
+        return data
+
+    def _index_event(self, index, event):
+        """Adds history[index] to the period index."""
+        events, clocked, lowest = self._period_index.setdefault(event['period'], ([], [], []))
+        events.append(index)
+        if event.get('clock') is not None:
+            clocked.append(index)
+            lowest.append(max(-event['clock'], lowest[-1]) if lowest else -event['clock'])
+
+    def _unindex_event(self, index, event):
+        """Takes the undone history[index] (the last event) out of the period index."""
+        events, clocked, lowest = self._period_index[event['period']]
+        events.pop()
+        if clocked and clocked[-1] == index:
+            clocked.pop()
+            lowest.pop()
+
+    def _build_period_index(self):
+        self._period_index = {}
+        for index, event in enumerate(self._history):
+            self._index_event(index, event)
+
+    def period_end_index(self, quarter_label):
+        """Event index at which quarter_label ended (or now, if it is still being played); None if it never started."""
+        history = self.history
+        with self.lock:
+            if quarter_label == self.get_current_quarter():
+                return len(history)
+            if self._period_index is None:
+                self._build_period_index()
+            events = self._period_index.get(quarter_label, ([], [], []))[0]
+            if not events:
+                return None
+            # The event that moves play to another period is not part of this one
+            last = history[events[-1]]
+            return events[-1] if last['type'] == 'quarter' and last['quarter'] != quarter_label else events[-1] + 1
+
+    def clock_index(self, quarter_label, clock_tenths):
+        """
+        Event index for a game-clock time in a period: everything before the period,
+        plus its events logged while the clock still showed at least clock_tenths.
+        """
+        # Resolved before taking the lock: loading the history flushes the writer, whose
+        # thread may be waiting for this lock to render the stats file
+        end = self.period_end_index(quarter_label)
+        if end is None:
+            return None
+        with self.lock:
+            if self._period_index is None:
+                self._build_period_index()
+            _, clocked, lowest = self._period_index.get(quarter_label, ([], [], []))
+            # lowest holds the negated lowest clock so far, so it only grows and can be bisected
+            position = bisect.bisect_right(lowest, -clock_tenths)
+            if position < len(clocked) and clocked[position] < end:
+                return clocked[position]
+            return end
+
+    def state_at_period_end(self, quarter_label):
+        """Game data as of the end of a period (e.g. the box score at halftime), or None if it never started."""
+        index = self.period_end_index(quarter_label)
+        return self.state_at(index) if index is not None else None
+
+    def state_at_clock(self, quarter_label, clock_tenths):
+        """Game data as of a game-clock time (tenths of a second left) in a period, or None."""
+        index = self.clock_index(quarter_label, clock_tenths)
+        return self.state_at(index) if index is not None else None
+
+    # --- QUARTER AND SCORE MANAGEMENT ---
+
+    def get_current_quarter(self):
+        """Returns the current quarter label (e.g., 'Q1', 'OT1')."""
+        return self.data.get('current_quarter', 'Q1')
+
+    def set_current_quarter(self, quarter_label):
+        """Sets the current quarter label."""
+        data = self.data
+        self._commit_event(_new_event(data, 'quarter', quarter=quarter_label, previous=data.get('current_quarter', 'Q1')))
+
+    def get_quarterly_score_breakdown(self):
+        """
+        Returns the per-period scores in period order, each with the cumulative
+        score after it. The rows are kept current as points are logged.
+        """
+        return [
+            {'label': label, 'score1': row['Team1'], 'score2': row['Team2'],
+             'cumulative1': row['Cumulative1'], 'cumulative2': row['Cumulative2']}
+            for label, row in self.data['quarterly_scores'].items()
+        ]
+
+    # --- PRIMARY UPDATE FUNCTIONS ---
+
+    def update_player_stat(self, player_name, stat_key, value):
+        """Updates a single stat for a player."""
+        data = self.data
+        stats = data['player_stats'].get(player_name, {})
+        effects = {stat_key: value}
+
+        if stat_key in SCORING_MAP and stat_key.endswith('_Made'):
+            attempt_key = SCORING_MAP[stat_key]['attempt_key']
+            effects[attempt_key] = effects.get(attempt_key, 0) + value
+
+        _clamp_attempt_effects(stats, effects)
+
+        # Points always follow from makes, so the event carries the points it adds
+        points = sum(effects.get(key, 0) * val['points'] for key, val in SCORING_MAP.items())
+        effects['Points'] = points
+        self._commit_event(_new_event(data, 'player_stat', player=player_name, stat=stat_key, delta=value, effects=effects))
+
+    def update_team_generic_stat(self, team_name, stat_key, value):
+        """Updates a generic stat for Team 1 (rebounds) or all stats for Team 2."""
+        if team_name not in ('Team1', 'Team2'):
+            return
+
+        data = self.data
+        effects = {stat_key: value}
+
+        if team_name == 'Team2':
+            # Only update points if a MADE shot stat is logged
+            if stat_key in SCORING_MAP and stat_key.endswith('_Made'):
+                effects['Points'] = effects.get('Points', 0) + SCORING_MAP[stat_key]['points'] * value
+
+                # Ensure attempts are at least as high as makes for T2
+                _clamp_attempt_effects(data['team2_generic_stats'], effects, [stat_key])
+            elif stat_key == 'Points':
+                # As for players, points only follow from makes (a recalculation would drop them)
+                effects['Points'] = 0
+
+        self._commit_event(_new_event(data, 'team_stat', team=team_name, stat=stat_key, delta=value, effects=effects))
+
+    def update_roster(self, name, team, number, is_starter):
+        """Adds or updates a player in the roster."""
+        data = self.data
+        roster_list = data['roster'].get(team, [])
 
+        # Check if player already exists (by name)
+        index = None
+        previous = None
+        for i, player in enumerate(roster_list):
+            if player['name'] == name:
+                index = i
+                previous = copy.deepcopy(player)
+                break
+
+        self._commit_event(_new_event(data, 'roster', name=name, team=team, number=number, starter=is_starter,
+                                      index=index, previous=previous,
+                                      new_stats=name not in data['player_stats']))
+
+    def remove_player(self, player_name):
+        """Removes a player from the roster and clears their stats."""
+        data = self.data
+        roster_list = data['roster'].get('Team1', [])
+        removed = [[i, copy.deepcopy(p)] for i, p in enumerate(roster_list) if p['name'] == player_name]
+        stats = copy.deepcopy(data['player_stats'].get(player_name))
+        period_stats = copy.deepcopy(data['period_stats']['players'].get(player_name))
+
+        self._commit_event(_new_event(data, 'remove_player', name=player_name, removed=removed, stats=stats,
+                                      period_stats=period_stats))
+
+    # --- DATA RETRIEVAL FUNCTIONS ---
+
+    def get_player_data(self, periods=None):
+        """
+        Compiles detailed, calculated stats for all Team 1 players: for the whole
+        game, or only the given periods, e.g. 'Q4', 'H2' (see PERIOD_GROUPS), 'OT'
+        for every overtime, or a list such as ['Q4', 'OT'].
+        """
+        game_data = self.data
+
+        if periods is not None:
+            selected = _period_selector(periods)
+            splits = game_data['period_stats']['players']
+        elif self._stat_matrix is not None:
+            # Percentages for every player in one vectorized pass
+            pct = self._stat_matrix.shooting_percentages()
+            return [
+                _player_entry(player, stats, float(pct['FT_Made'][i]), float(pct['2P_Made'][i]), float(pct['3P_Made'][i]))
+                for i, (player, (_, stats)) in enumerate(zip(game_data['roster']['Team1'], self._stat_matrix.player_rows()))
+            ]
+
+        data = []
+
+        for player in game_data['roster']['Team1']:
+            if periods is None:
+                stats = game_data['player_stats'].get(player['name'], {})
+            else:
+                stats = _sum_periods(splits.get(player['name'], {}), selected)
+
+            # Retrieve/Calculate fields needed for GUI display
+            ft_att = stats.get('FT_Attempted', 0)
+            twop_att = stats.get('2P_Attempted', 0)
+            threep_att = stats.get('3P_Attempted', 0)
+
+            ft_made = stats.get('FT_Made', 0)
+            twop_made = stats.get('2P_Made', 0)
+            threep_made = stats.get('3P_Made', 0)
+
+            ft_pct = _safe_percentage(ft_made, ft_att)
+            twop_pct = _safe_percentage(twop_made, twop_att)
+            threep_pct = _safe_percentage(threep_made, threep_att)
+
+            data.append(_player_entry(player, stats, ft_pct, twop_pct, threep_pct))
+        return data
+
+    def get_leaderboard(self, stat_key, limit=None):
+        """Returns [(player_name, value)] for Team 1, highest stat_key first."""
+        data = self.data
+        if self._stat_matrix is not None:
+            return self._stat_matrix.leaderboard(stat_key, limit)
+
+        board = [(p['name'], data['player_stats'].get(p['name'], {}).get(stat_key, 0)) for p in data['roster']['Team1']]
+        board.sort(key=lambda item: -item[1])
+        return board[:limit] if limit is not None else board
+
+    def get_current_score(self):
+        return self.data['team_score']
+
+    def get_team_stats(self, team_name, periods=None):
+        """
+        Retrieves aggregated stats for Team 1 or generic stats for Team 2, for the
+        whole game or only the given periods (as in get_player_data).
+        """
+        data = self.data
+        if periods is not None:
+            return self._team_stats_for_periods(team_name, _period_selector(periods))
+
+        if team_name == 'Team1':
+            # Player-recorded totals are maintained incrementally as stats are logged
+            if self._stat_matrix is not None:
+                team1_total_stats = self._stat_matrix.team_totals()
+            else:
+                team1_total_stats = dict(self._team1_totals)
+
+            # Add Team Rebounds (which were excluded from player totals)
+            team1_total_stats['Off_Rebounds'] += data['team1_team_rebounds']['Off_Rebounds']
+            team1_total_stats['Def_Rebounds'] += data['team1_team_rebounds']['Def_Rebounds']
+
+            return team1_total_stats
+
+        elif team_name == 'Team2':
+            return data['team2_generic_stats']
+
+        return {}
+
+    def _team_stats_for_periods(self, team_name, selected):
+        period_stats = self.data['period_stats']
+        if team_name == 'Team1':
+            totals = {k: 0 for k in STAT_KEYS_T1}
+            for name in self._team1_names:
+                _sum_periods(period_stats['players'].get(name, {}), selected, totals)
+            team_rebounds = _sum_periods(period_stats['teams'].get('Team1', {}), selected)
+            totals['Off_Rebounds'] += team_rebounds.get('Off_Rebounds', 0)
+            totals['Def_Rebounds'] += team_rebounds.get('Def_Rebounds', 0)
+            return totals
+
+        elif team_name == 'Team2':
+            return _sum_periods(period_stats['teams'].get('Team2', {}), selected, {k: 0 for k in TEAM_STAT_KEYS})
+
+        return {}
+
+    def get_roster(self, team_name):
+        """Retrieves the roster for a specified team."""
+        return self.data['roster'].get(team_name, [])
+
+
+# --- DEFAULT SESSION ---
+# The module-level API below is a thin shim over one default session, so existing
+# callers keep working. Importing this module touches no files; the default
+# session loads on first use. `StatsTracker.game_data` and
+# `StatsTracker.action_history` still resolve to the default session's state.
+
+_default_session = GameSession()
+
+def get_default_session():
+    """Returns the session behind the module-level functions."""
+    return _default_session
+
+def __getattr__(name):
+    if name == 'game_data':
+        return _default_session.data
+    if name == 'action_history':
+        return _default_session.history
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def set_save_interval(interval_s, idle_s=None):
+    """Configures how long changes may wait before being flushed to disk."""
+    _writer.interval_s = interval_s
+    if idle_s is not None:
+        _writer.idle_s = idle_s
+
+def save_data():
+    _default_session.save_data()
+
+def flush_data():
+    _default_session.flush_data()
+
+def load_data():
+    _default_session.load_data()
 
 def undo_last_action():
-    """Reverts the game state to the previous snapshot."""
-    global game_data, action_history
-    if action_history:
-        previous_state = action_history.pop()
-        game_data = previous_state
-            
-        save_data()
-        return True
-    return False
+    return _default_session.undo_last_action()
+
+def redo_last_action():
+    return _default_session.redo_last_action()
 
 def reset_all_stats():
-    """Resets all game data and clears history."""
-    global game_data, action_history
-    game_data = copy.deepcopy(DEFAULT_STATS)
-    action_history = []
-    
-    if os.path.exists(STATS_FILE):
-        os.remove(STATS_FILE)
-    if os.path.exists(HISTORY_FILE):
-        os.remove(HISTORY_FILE)
-    
-    _recalculate_all_scores() 
-    save_data()
-
-
-# --- SCORE CALCULATION LOGIC ---
+    _default_session.reset_all_stats()
 
-def _recalculate_player_score(player_name):
-    """Calculates points and updates attempts for a single player."""
-    stats = game_data['player_stats'].get(player_name, {})
-    
-    total_points = 0
-    total_points += stats.get('FT_Made', 0) * SCORING_MAP['FT_Made']['points']
-    total_points += stats.get('2P_Made', 0) * SCORING_MAP['2P_Made']['points']
-    total_points += stats.get('3P_Made', 0) * SCORING_MAP['3P_Made']['points']
-    
-    # Ensure attempts are at least as high as makes
-    for key, val in SCORING_MAP.items():
-        made = stats.get(key, 0)
-        attempt_key = val['attempt_key']
-        stats[attempt_key] = max(stats.get(attempt_key, 0), made)
-    
-    stats['Points'] = total_points
-    game_data['player_stats'][player_name] = stats
-    return total_points
+def add_listener(callback):
+    _default_session.add_listener(callback)
 
+def remove_listener(callback):
+    _default_session.remove_listener(callback)
 
-def _recalculate_all_scores():
-    """Recalculates scores for all teams and players."""
-    
-    total_t1_score = 0
-    
-    for player in game_data['roster']['Team1']:
-        total_t1_score += _recalculate_player_score(player['name'])
+def attach_clock(clock):
+    _default_session.attach_clock(clock)
+
+def begin_batch():
+    _default_session.begin_batch()
+
+def end_batch():
+    _default_session.end_batch()
 
-    total_t2_score = game_data['team2_generic_stats'].get('Points', 0)
+def batch():
+    return _default_session.batch()
+
+def attach_season_store(store_or_path=SEASON_DB_FILE):
+    return _default_session.attach_season_store(store_or_path)
+
+def get_season_store():
+    return _default_session.season_store
+
+def enable_stat_matrix(enabled=True):
+    return _default_session.enable_stat_matrix(enabled)
+
+def check_score_consistency():
+    return _default_session.check_score_consistency()
+
+def _recalculate_player_score(player_name):
+    return _default_session._recalculate_player_score(player_name)
+
+def _recalculate_all_scores():
+    _default_session._recalculate_all_scores()
 
-    game_data['team_score']['Team1'] = total_t1_score
-    game_data['team_score']['Team2'] = total_t2_score
+def state_at(index):
+    return _default_session.state_at(index)
 
+def state_at_period_end(quarter_label):
+    return _default_session.state_at_period_end(quarter_label)
 
-# --- QUARTER AND SCORE MANAGEMENT ---
+def state_at_clock(quarter_label, clock_tenths):
+    return _default_session.state_at_clock(quarter_label, clock_tenths)
 
 def get_current_quarter():
-    """Returns the current quarter label (e.g., 'Q1', 'OT1')."""
-    return game_data.get('current_quarter', 'Q1')
+    return _default_session.get_current_quarter()
 
 def set_current_quarter(quarter_label):
-    """Sets the current quarter label."""
-    _push_history()
-    game_data['current_quarter'] = quarter_label
-    save_data()
-
-def set_end_of_quarter_score(quarter_label, t1_cumulative_score, t2_cumulative_score):
-    """
-    Records the final cumulative score at the end of a quarter, 
-    calculates the quarter's score, and prepares for the next quarter.
-    """
-    _push_history()
-    
-    quarter_data = game_data['quarterly_scores'].get(quarter_label)
-    if not quarter_data:
-        # Handle new overtime period creation if needed
-        if quarter_label.startswith('OT'):
-            game_data['quarterly_scores'][quarter_label] = copy.deepcopy(QUARTER_STRUCTURE['Q1']) 
-        
-        quarter_data = game_data['quarterly_scores'].get(quarter_label)
-        if not quarter_data:
-             print(f"Error: Could not find or create structure for {quarter_label}")
-             return 
-
-    # 1. Determine Previous Cumulative Score
-    quarter_keys = list(game_data['quarterly_scores'].keys())
-    q_index = quarter_keys.index(quarter_label)
-    
-    if q_index > 0:
-        prev_q_key = quarter_keys[q_index - 1]
-        prev_cumulative_t1 = game_data['quarterly_scores'][prev_q_key]['Cumulative1']
-        prev_cumulative_t2 = game_data['quarterly_scores'][prev_q_key]['Cumulative2']
-    else:
-        prev_cumulative_t1 = 0
-        prev_cumulative_t2 = 0
-        
-    # 2. Calculate Quarter Score
-    q_score_t1 = t1_cumulative_score - prev_cumulative_t1
-    q_score_t2 = t2_cumulative_score - prev_cumulative_t2
-    
-    # 3. Update Data Structure
-    quarter_data['Cumulative1'] = t1_cumulative_score
-    quarter_data['Cumulative2'] = t2_cumulative_score
-    quarter_data['Team1'] = q_score_t1
-    quarter_data['Team2'] = q_score_t2
-    
-    # 4. Check for and update next OT number
-    if quarter_label.startswith('OT'):
-        ot_num = int(quarter_label.replace('OT', ''))
-        if ot_num == game_data['next_ot_num']:
-            game_data['next_ot_num'] += 1
-    
-    save_data()
+    _default_session.set_current_quarter(quarter_label)
 
 def get_quarterly_score_breakdown():
-    """Returns the ordered list of quarterly score data."""
-    # Ensure standard quarters are first, followed by OT in order
-    keys = list(game_data['quarterly_scores'].keys())
-    standard_keys = [k for k in keys if k.startswith('Q') and len(k) == 2]
-    ot_keys = [k for k in keys if k.startswith('OT')]
-    
-    standard_keys.sort() 
-    ot_keys.sort(key=lambda x: int(x.replace('OT', ''))) 
-    
-    ordered_keys = standard_keys + ot_keys
-    
-    breakdown = []
-    for key in ordered_keys:
-        breakdown.append({
-            'label': key,
-            'score1': game_data['quarterly_scores'][key]['Team1'],
-            'score2': game_data['quarterly_scores'][key]['Team2'],
-            'cumulative1': game_data['quarterly_scores'][key]['Cumulative1'],
-            'cumulative2': game_data['quarterly_scores'][key]['Cumulative2']
-        })
-            
-    return breakdown
-
-
-# --- PRIMARY UPDATE FUNCTIONS ---
+    return _default_session.get_quarterly_score_breakdown()
 
 def update_player_stat(player_name, stat_key, value):
-    """Updates a single stat for a player."""
-    _push_history() 
-    
-    if player_name not in game_data['player_stats']:
-        game_data['player_stats'][player_name] = {k: 0 for k in STAT_KEYS_T1}
-
-    current_val = game_data['player_stats'][player_name].get(stat_key, 0)
-    game_data['player_stats'][player_name][stat_key] = current_val + value
-    
-    if stat_key in SCORING_MAP and stat_key.endswith('_Made'):
-        attempt_key = SCORING_MAP[stat_key]['attempt_key']
-        attempt_val = game_data['player_stats'][player_name].get(attempt_key, 0)
-        game_data['player_stats'][player_name][attempt_key] = attempt_val + value
-
-    _recalculate_all_scores()
-    save_data()
+    _default_session.update_player_stat(player_name, stat_key, value)
 
 def update_team_generic_stat(team_name, stat_key, value):
-    """Updates a generic stat for Team 1 (rebounds) or all stats for Team 2."""
-    _push_history() 
-    
-    if team_name == 'Team1':
-        current_val = game_data['team1_team_rebounds'].get(stat_key, 0)
-        game_data['team1_team_rebounds'][stat_key] = current_val + value
-    
-    elif team_name == 'Team2':
-        current_val = game_data['team2_generic_stats'].get(stat_key, 0)
-        game_data['team2_generic_stats'][stat_key] = current_val + value
-        
-        # Only update points if a MADE shot stat is logged
-        if stat_key in SCORING_MAP and stat_key.endswith('_Made'):
-            points = SCORING_MAP[stat_key]['points'] * value
-            current_points = game_data['team2_generic_stats'].get('Points', 0)
-            game_data['team2_generic_stats']['Points'] = current_points + points
-            
-        # Ensure attempts are at least as high as makes for T2
-        if stat_key in SCORING_MAP and stat_key.endswith('_Made'):
-            attempt_key = SCORING_MAP[stat_key]['attempt_key']
-            made = game_data['team2_generic_stats'].get(stat_key, 0)
-            attempted = game_data['team2_generic_stats'].get(attempt_key, 0)
-            game_data['team2_generic_stats'][attempt_key] = max(attempted, made)
-            
-    _recalculate_all_scores()
-    save_data()
-
+    _default_session.update_team_generic_stat(team_name, stat_key, value)
 
 def update_roster(name, team, number, is_starter):
-    """Adds or updates a player in the roster."""
-    _push_history()
-    
-    new_player = {'name': name, 'team': team, 'number': number, 'starter': is_starter}
-    
-    roster_list = game_data['roster'].get(team, [])
-    
-    # Check if player already exists (by name)
-    found = False
-    for i, player in enumerate(roster_list):
-        if player['name'] == name:
-            roster_list[i] = new_player
-            found = True
-            break
-            
-    if not found:
-        roster_list.append(new_player)
-        
-    game_data['roster'][team] = roster_list
-    
-    # Initialize stats if this is a new player
-    if name not in game_data['player_stats']:
-        game_data['player_stats'][name] = {k: 0 for k in STAT_KEYS_T1}
-    
-    save_data()
+    _default_session.update_roster(name, team, number, is_starter)
 
 def remove_player(player_name):
-    """Removes a player from the roster and clears their stats."""
-    _push_history()
-    
-    roster_list = game_data['roster'].get('Team1', [])
-    game_data['roster']['Team1'] = [p for p in roster_list if p['name'] != player_name]
-    
-    if player_name in game_data['player_stats']:
-        del game_data['player_stats'][player_name]
-        
-    _recalculate_all_scores()
-    save_data()
+    _default_session.remove_player(player_name)
 
+def get_player_data(periods=None):
+    return _default_session.get_player_data(periods)
 
-# --- DATA RETRIEVAL FUNCTIONS ---
-
-def _safe_percentage(made, attempted):
-    """Calculates percentage, returning 0.0 if attempted is zero."""
-    return round(made / attempted * 100, 1) if attempted > 0 else 0.0
-
-def get_player_data():
-    """Compiles detailed, calculated stats for all Team 1 players."""
-    data = []
-    
-    for player in game_data['roster']['Team1']:
-        stats = game_data['player_stats'].get(player['name'], {}) 
-
-        # Retrieve/Calculate fields needed for GUI display
-        ft_att = stats.get('FT_Attempted', 0)
-        twop_att = stats.get('2P_Attempted', 0)
-        threep_att = stats.get('3P_Attempted', 0)
-
-        ft_made = stats.get('FT_Made', 0)
-        twop_made = stats.get('2P_Made', 0)
-        threep_made = stats.get('3P_Made', 0)
-
-        ft_pct = _safe_percentage(ft_made, ft_att)
-        twop_pct = _safe_percentage(twop_made, twop_att)
-        threep_pct = _safe_percentage(threep_made, threep_att)
-
-        data.append({
-            'name': player['name'],
-            'team': player['team'],
-            'number': player['number'],
-            'starter': player['starter'],
-            'Points': stats.get('Points', 0),
-            'Assists': stats.get('Assists', 0),
-            'Steals': stats.get('Steals', 0),
-            'Blocks': stats.get('Blocks', 0),
-            'Turnovers': stats.get('Turnovers', 0),
-            'Fouls': stats.get('Fouls', 0),
-            'Off_Rebounds': stats.get('Off_Rebounds', 0),
-            'Def_Rebounds': stats.get('Def_Rebounds', 0),
-            'FT_PCT': ft_pct,
-            '2P_PCT': twop_pct,
-            '3P_PCT': threep_pct,
-            'FT_Made': ft_made, 'FT_Attempted': ft_att,
-            '2P_Made': twop_made, '2P_Attempted': twop_att,
-            '3P_Made': threep_made, '3P_Attempted': threep_att
-        })
-    return data
+def get_leaderboard(stat_key, limit=None):
+    return _default_session.get_leaderboard(stat_key, limit)
 
 def get_current_score():
-    return game_data['team_score']
-    
-def get_team_stats(team_name):
-    """Retrieves aggregated stats for Team 1 or generic stats for Team 2."""
-    if team_name == 'Team1':
-        # To get the full team stats for Team 1, we must sum player stats and team rebounds.
-        # Use a list of all T1 stats keys for initialization
-        team1_total_stats = {k: 0 for k in STAT_KEYS_T1}
-        
-        # Sum player-recorded stats
-        for player in game_data['roster']['Team1']:
-            player_stats = game_data['player_stats'].get(player['name'], {})
-            
-            for key in team1_total_stats:
-                team1_total_stats[key] += player_stats.get(key, 0)
-                    
-        # Add Team Rebounds (which were excluded from player totals)
-        team1_total_stats['Off_Rebounds'] += game_data['team1_team_rebounds']['Off_Rebounds']
-        team1_total_stats['Def_Rebounds'] += game_data['team1_team_rebounds']['Def_Rebounds']
-        
-        return team1_total_stats
-        
-    elif team_name == 'Team2':
-        return game_data['team2_generic_stats']
-        
-    return {} 
+    return _default_session.get_current_score()
 
-def get_roster(team_name):
-    """Retrieves the roster for a specified team."""
-    return game_data['roster'].get(team_name, [])
+def get_team_stats(team_name, periods=None):
+    return _default_session.get_team_stats(team_name, periods)
 
-# --- INITIALIZATION ---
-load_data()
\ No newline at end of file
+def get_roster(team_name):
+    return _default_session.get_roster(team_name)
@@ -0,0 +1,84 @@
+"""
+Threading regression tests for GameSession and the write-behind writer.
+
+Run with:  python -m unittest test_session_threads
+"""
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import StatsTracker
+from Persistence import WriteBehindWriter
+
+TIMEOUT_S = 5.0
+
+
+class LazyHistoryLockTest(unittest.TestCase):
+    """Reading the undo history for the first time must not flush the writer while holding the session lock."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        # Long cadence: the writer only flushes when asked to
+        self.writer = WriteBehindWriter(interval_s=60.0, idle_s=60.0)
+        game = StatsTracker.GameSession(self.directory, writer=self.writer)
+        game.reset_all_stats()
+        game.update_player_stat("Player A", "2P_Made", 1)
+        game.set_current_quarter("Q2")
+        game.update_player_stat("Player B", "3P_Made", 1)
+        game.flush_data()
+
+    def tearDown(self):
+        self.writer.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _check_no_deadlock(self, query):
+        # The saved stats reflect the whole log, so the history is left unread until first needed
+        session = StatsTracker.GameSession(self.directory, writer=self.writer)
+        self.assertIsNotNone(session.data)
+        self.assertIsNone(session._history)
+
+        rendering, go = threading.Event(), threading.Event()
+        render = session._render_stats
+
+        def slow_render():
+            rendering.set()
+            go.wait(TIMEOUT_S)
+            return render()
+
+        session._render_stats = slow_render
+        session.save_data()
+
+        # A flush that has started rendering the stats file (it holds the writer's flush lock
+        # and is about to take the session lock) ...
+        flusher = threading.Thread(target=self.writer.flush, daemon=True)
+        flusher.start()
+        self.assertTrue(rendering.wait(TIMEOUT_S))
+
+        # ... while a time-travel query loads the history
+        results = []
+        reader = threading.Thread(target=lambda: results.append(query(session)), daemon=True)
+        reader.start()
+        time.sleep(0.2)
+        go.set()
+
+        flusher.join(TIMEOUT_S)
+        reader.join(TIMEOUT_S)
+        self.assertFalse(flusher.is_alive(), "writer flush deadlocked")
+        self.assertFalse(reader.is_alive(), "history query deadlocked")
+        return results[0]
+
+    def test_clock_index(self):
+        self.assertEqual(self._check_no_deadlock(lambda session: session.clock_index("Q1", 100)), 1)
+
+    def test_period_end_index(self):
+        self.assertEqual(self._check_no_deadlock(lambda session: session.period_end_index("Q1")), 1)
+
+    def test_state_at_period_end(self):
+        state = self._check_no_deadlock(lambda session: session.state_at_period_end("Q1"))
+        self.assertEqual(state['team_score'], {'Team1': 2, 'Team2': 0})
+
+
+if __name__ == "__main__":
+    unittest.main()